@@ -0,0 +1,55 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+# Compare drawing sprites pixel by pixel against drawing the compiled spans.
+# Upload the tinydrawer package and both examples to the Pi Pico, then run this file
+
+import framebuf
+from time import ticks_us, ticks_diff
+from tinydrawer import TinyDrawer
+import example_mario, example_snake
+
+ZOOM = 5
+REPEAT = 20
+
+class CountingFrameBuffer(framebuf.FrameBuffer):
+    def __init__(self, width: int, height: int):
+        super().__init__(bytearray(width * height * 2), width, height, framebuf.RGB565)
+        self.fill_rects = 0
+
+    def fill_rect(self, x: int, y: int, w: int, h: int, c: int):
+        self.fill_rects += 1
+        super().fill_rect(x, y, w, h, c)
+
+def drawer(example) -> TinyDrawer:
+    hex_string = "".join("%x" % c for c in example.td.buffer)
+    td = TinyDrawer(hex_string, example.td.buffer_w, example.td.buffer_h, zoom = ZOOM)
+    return td
+
+def measure(td: TinyDrawer, sprites: list) -> tuple:
+    fb = CountingFrameBuffer(8 * ZOOM, 8 * ZOOM)
+    start = ticks_us()
+    for _ in range(REPEAT):
+        for n in sprites:
+            td.spr(fb, n, 0, 0)
+    elapsed = ticks_diff(ticks_us(), start)
+    return fb.fill_rects // REPEAT, elapsed // REPEAT
+
+def run():
+    cases = [
+        ("snake digits 8-17", example_snake, list(range(8, 18))),
+        ("mario brick 1", example_mario, [1]),
+        ("mario player 0", example_mario, [0]),
+    ]
+    print("{:<20}{:>10}{:>10}{:>8}{:>12}{:>12}".format("sprites", "pixels", "spans", "ratio", "pixels us", "spans us"))
+    for name, example, sprites in cases:
+        td = drawer(example)
+        pixel_calls, pixel_us = measure(td, sprites)
+        td.compile_spans()
+        span_calls, span_us = measure(td, sprites)
+        print("{:<20}{:>10}{:>10}{:>8.1f}{:>12}{:>12}".format(name, pixel_calls, span_calls, pixel_calls / span_calls, pixel_us, span_us))
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,254 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+# Host benchmark suite, run with CPython from the repository folder:
+#
+#   python benchmarks/run.py                       compare against benchmarks/baseline.json
+#   python benchmarks/run.py --time-threshold 0.5  also fail when a case is 50% slower
+#   python benchmarks/run.py --update              save the current results as the baseline
+#
+# Every case counts the frame buffer calls and the bytes sent to the display,
+# measures the wall time, and hashes the final frame. The run fails when a count
+# grows beyond the threshold or when a frame differs from the baseline. Wall times
+# vary between runs and computers, so they are only compared with --time-threshold
+
+import argparse, hashlib, json, os, sys
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARKS), "host"))
+import shims
+shims.install()
+
+import framebuf, time
+from tinydrawer import TinyDrawer
+from tinydrawer.tilemap import TileMap
+from tinydrawer.strips import StripRenderer
+from lcd_1inch14 import LCD_1inch14
+import example_mario
+
+BASELINE = os.path.join(BENCHMARKS, "baseline.json")
+DISPLAY_W = 240
+DISPLAY_H = 135
+COUNTERS = ("fill_rect", "blit", "pixel", "spi_bytes")
+
+class CountingFrameBuffer(framebuf.FrameBuffer):
+    def __init__(self, width: int = DISPLAY_W, height: int = DISPLAY_H):
+        self.buffer = bytearray(width * height * 2)
+        super().__init__(self.buffer, width, height, framebuf.RGB565)
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.counts = {"fill_rect": 0, "blit": 0, "pixel": 0}
+
+    def fill_rect(self, x: int, y: int, w: int, h: int, c: int):
+        self.counts["fill_rect"] += 1
+        super().fill_rect(x, y, w, h, c)
+
+    def blit(self, source, x: int, y: int, key: int = -1, palette = None):
+        self.counts["blit"] += 1
+        super().blit(source, x, y, key, palette)
+
+    def pixel(self, x: int, y: int, c: int = None):
+        self.counts["pixel"] += 1
+        return super().pixel(x, y, c)
+
+def drawer(zoom: int, mode: str = "pixel") -> TinyDrawer:
+    hex_string = "".join("%x" % c for c in example_mario.td.buffer)
+    td = TinyDrawer(hex_string, example_mario.td.buffer_w, example_mario.td.buffer_h, DISPLAY_W, DISPLAY_H, zoom)
+    if mode == "spans":
+        td.compile_spans()
+    elif mode == "cache":
+        td.set_cache(65536)
+    elif mode == "palette_blit":
+        td.set_palette_blit(65536)
+    return td
+
+def sprites(zoom: int, mode: str = "pixel", flip_x: bool = False, flip_y: bool = False, pal: tuple = None):
+    td = drawer(zoom, mode)
+    size = 8 * zoom
+    def draw(fb):
+        if pal:
+            td.pal(*pal)
+        # a grid of the player, brick, question block and coin sprites
+        for i, y in enumerate(range(0, DISPLAY_H - size + 1, size)):
+            for j, x in enumerate(range(0, DISPLAY_W - size + 1, size)):
+                td.spr(fb, (i + j) % 4, x, y, 1, 1, flip_x, flip_y)
+        td.pal()
+    return draw
+
+def tiles(zoom: int, mode: str = "pixel"):
+    td = drawer(zoom, mode)
+    size = 8 * zoom
+    tilemap = TileMap((DISPLAY_W + size - 1) // size, (DISPLAY_H + size - 1) // size)
+    for i in range(len(tilemap.tiles)):
+        tilemap.tiles[i] = 1
+    def draw(fb):
+        td.map(fb, tilemap)
+    return draw
+
+def show(dirty: bool, scale: int = 1, color_bits: int = 16, indexed: bool = False):
+    td = drawer(4 // scale)
+    lcd = LCD_1inch14(9, 12, 8, 11, 10, DISPLAY_W, DISPLAY_H, dirty_tracking = dirty, scale = scale, color_bits = color_bits, indexed = indexed)
+    if indexed:
+        td.set_indexed(lcd)
+    td.display_w, td.display_h = lcd.width, lcd.height
+    td.clip()
+    def draw(fb):
+        lcd.fill(td.color(1))
+        if dirty:
+            lcd.show(full = True)
+        lcd.spi.reset_counters()
+        td.spr(lcd, 0, 100 // scale, 60 // scale)
+        lcd.show()
+        # the frame of a scaled or indexed display is compared by its own buffer
+        fb.buffer[:len(lcd.buffer)] = lcd.buffer
+        return lcd.spi.bytes_written
+    return draw
+
+def strips(mode: str = "pixel", rows: int = 16):
+    td = drawer(4, mode)
+    lcd = LCD_1inch14(9, 12, 8, 11, 10, DISPLAY_W, DISPLAY_H, buffered = False)
+    renderer = StripRenderer(td, lcd, rows)
+    strip = renderer.strip
+    fill_rect, blit = strip.fill_rect, strip.blit
+    size = 32
+    def draw(fb):
+        # the draws on the strip are counted as draws on the frame
+        def counting_fill_rect(*args):
+            fb.counts["fill_rect"] += 1
+            fill_rect(*args)
+        def counting_blit(*args):
+            fb.counts["blit"] += 1
+            blit(*args)
+        strip.fill_rect, strip.blit = counting_fill_rect, counting_blit
+        lcd.spi.reset_counters()
+        lcd.spi.log = []
+        # the sprite grid of sprites(4), moved down so every sprite is cut by a strip
+        renderer.cls()
+        for i, y in enumerate(range(size // 2, DISPLAY_H - size + 1, size)):
+            for j, x in enumerate(range(0, DISPLAY_W - size + 1, size)):
+                renderer.spr((i + j) % 4, x, y)
+        renderer.render()
+        # the frame is put together from the strips sent to the display
+        frame = b"".join(data for data in lcd.spi.log if len(data) > 4)
+        fb.buffer[:len(frame)] = frame
+        return lcd.spi.bytes_written
+    return draw
+
+def scroll(step: int = 4):
+    td = drawer(4)
+    lcd = LCD_1inch14(9, 12, 8, 11, 10, DISPLAY_W, DISPLAY_H, buffered = False)
+    tilemap = TileMap(16, 5)
+    for i in range(len(tilemap.tiles)):
+        tilemap.tiles[i] = i % 4
+    def draw(fb):
+        # the map is on the display after the first frame, then each frame scrolls it by step pixels
+        td.map_scroll(lcd, tilemap, 0, 0)
+        lcd.spi.reset_counters()
+        td.map_scroll(lcd, tilemap, step, 0)
+        # the frame is compared by the last band sent
+        fb.buffer[:len(td.scroll_band)] = td.scroll_band
+        return lcd.spi.bytes_written
+    return draw
+
+CASES = [
+    ("spr zoom 1", lambda: sprites(1)),
+    ("spr zoom 2", lambda: sprites(2)),
+    ("spr zoom 3", lambda: sprites(3)),
+    ("spr zoom 4", lambda: sprites(4)),
+    ("spr zoom 5", lambda: sprites(5)),
+    ("spr flip_x", lambda: sprites(4, flip_x = True)),
+    ("spr flip_y", lambda: sprites(4, flip_y = True)),
+    ("spr flip_xy", lambda: sprites(4, flip_x = True, flip_y = True)),
+    ("spr pal", lambda: sprites(4, pal = (8, 11))),
+    ("spr spans", lambda: sprites(4, "spans")),
+    ("spr cache", lambda: sprites(4, "cache")),
+    ("spr palette_blit", lambda: sprites(4, "palette_blit")),
+    ("map zoom 1", lambda: tiles(1)),
+    ("map zoom 4", lambda: tiles(4)),
+    ("map zoom 4 spans", lambda: tiles(4, "spans")),
+    ("map scroll", lambda: scroll()),
+    ("strips", lambda: strips()),
+    ("strips cache", lambda: strips("cache")),
+    ("show full", lambda: show(False)),
+    ("show dirty", lambda: show(True)),
+    ("show scaled", lambda: show(False, 4)),
+    ("show scaled dirty", lambda: show(True, 4)),
+    ("show rgb444", lambda: show(False, 1, 12)),
+    ("show rgb444 dirty", lambda: show(True, 1, 12)),
+    ("show indexed", lambda: show(False, 1, 16, True)),
+    ("show indexed dirty", lambda: show(True, 1, 16, True)),
+    ("show indexed rgb444", lambda: show(False, 1, 12, True)),
+]
+
+def measure(make, repeat: int) -> dict:
+    draw = make()
+    fb = CountingFrameBuffer()
+    # the first frame fills the caches, the counts are taken from the last frame
+    best = None
+    for _ in range(repeat + 1):
+        fb.fill(0)
+        fb.reset_counters()
+        start = time.ticks_us()
+        spi_bytes = draw(fb) or 0
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+        if best is None or elapsed < best:
+            best = elapsed
+    result = dict(fb.counts)
+    result["spi_bytes"] = spi_bytes
+    result["us"] = best
+    result["frame"] = hashlib.sha256(fb.buffer).hexdigest()[:16]
+    return result
+
+def compare(name: str, result: dict, base: dict, count_threshold: float, time_threshold: float) -> list:
+    errors = []
+    for counter in COUNTERS:
+        if result[counter] > base.get(counter, 0) * (1 + count_threshold):
+            errors.append("{}: {} {} -> {}".format(name, counter, base.get(counter, 0), result[counter]))
+    if time_threshold >= 0 and result["us"] > base["us"] * (1 + time_threshold):
+        errors.append("{}: us {} -> {}".format(name, base["us"], result["us"]))
+    if result["frame"] != base["frame"]:
+        errors.append("{}: frame {} -> {}".format(name, base["frame"], result["frame"]))
+    return errors
+
+def run() -> int:
+    parser = argparse.ArgumentParser(description = "Benchmark TinyDrawer on the host and compare against the baseline")
+    parser.add_argument("--update", action = "store_true", help = "save the results as the new baseline")
+    parser.add_argument("--repeat", type = int, default = 3, help = "frames measured per case, the fastest is kept")
+    parser.add_argument("--count-threshold", type = float, default = 0.0, help = "allowed growth of the counts, 0.1 = 10%%")
+    parser.add_argument("--time-threshold", type = float, default = -1.0, help = "allowed growth of the time, 0.5 = 50%%, negative to skip (default)")
+    parser.add_argument("--baseline", default = BASELINE, help = "the baseline JSON file")
+    parser.add_argument("cases", nargs = "*", help = "only run the cases containing these words")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    results = {}
+    errors = []
+    print("{:<20}{:>10}{:>8}{:>8}{:>10}{:>10}  {}".format("case", "fill_rect", "blit", "pixel", "spi_bytes", "us", "frame"))
+    for name, make in CASES:
+        if args.cases and not any(word in name for word in args.cases):
+            continue
+        result = measure(make, args.repeat)
+        results[name] = result
+        print("{:<20}{fill_rect:>10}{blit:>8}{pixel:>8}{spi_bytes:>10}{us:>10}  {frame}".format(name, **result))
+        if name in baseline and not args.update:
+            errors += compare(name, result, baseline[name], args.count_threshold, args.time_threshold)
+
+    if args.update:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent = 2, sort_keys = True)
+            f.write("\n")
+        print("saved", args.baseline)
+        return 0
+    for error in errors:
+        print("REGRESSION", error)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -7,6 +7,10 @@ from machine import Pin, SPI, PWM
 import framebuf, time, random, micropython, math
 from lcd_1inch14 import LCD_1inch14
 from tinydrawer import TinyDrawer
+from tinydrawer.tilemap import TileMap
+from tinydrawer.profiler import Profiler
+from tinydrawer.game_loop import GameLoop
+from tinydrawer.gamepad import Gamepad, BUTTON_A, BUTTON_B, BUTTON_UP, BUTTON_CTRL, BUTTON_LEFT, BUTTON_DOWN, BUTTON_RIGHT
 
 # setup for lcd_1inch14.py
 
@@ -31,6 +35,7 @@ PIN_RIGHT = 20
 
 FPS = 30
 SHOW_FPS = True
+PROFILE = False # print where the time of a frame goes, once per second
 display_w = 240
 display_h = 135
 
@@ -74,14 +79,15 @@ class Coin:
     def __init__(self, x, y, fb):
         self.x, self.y = x, y
         self.count = 0
-    def draw(self):
+    def update(self):
         self.count += 1
+        if self.count > 20:
+            self.count = 0
+    def draw(self):
         if self.count > 10:
             n = 4
         else:
             n = 3
-        if self.count > 20:
-            self.count = 0
         td.spr(fb, n, self.x, self.y)
 
 class Player:
@@ -102,17 +108,13 @@ class Player:
             self.x = td.display_w
         elif self.x > td.display_w:
             self.x = -8 * td.zoom
-    def draw(self):
+    def update(self):
         self.y += self.vy
         if self.y < self.y_floor:
             self.vy += td.zoom
         else:
             self.y = self.y_floor
             self.vy = 0
-        if self.y == self.y_floor:
-            n = 0
-        else:
-            n = 8
         if self.autoplay:
             if self.countdown == 0:
                 self.countdown = random.randint(3, 30)
@@ -121,6 +123,11 @@ class Player:
             self.move(self.next_move)
             if not self.next_move == 0 and random.randint(0, 6) == 0:
                 self.jump()
+    def draw(self):
+        if self.y == self.y_floor:
+            n = 0
+        else:
+            n = 8
         if self.is_luigi:
             td.pal(8, 11)
         td.spr(fb, n, self.x, self.y, flip_x=self.facing_left)
@@ -136,33 +143,27 @@ if __name__=='__main__':
     pwm.freq(1000)
     pwm.duty_u16(65535) # brightness [0-32768-65535]
 
-    fb = LCD_1inch14(CS, RST, DC, MOSI, SCK, width=display_w, height=display_h)
+    # only send the regions that change to the display
+    fb = LCD_1inch14(CS, RST, DC, MOSI, SCK, width=display_w, height=display_h, dirty_tracking=True)
     
     td.zoom = 4
+    td.set_palette_blit(8192) # draw the sprites with blit, pal(8, 11) for luigi is free
     step = 8 * td.zoom
     
     player = Player(2 * step, display_h - 2 * step, fb)
     coin = Coin(step, display_h - 4 * step, fb)
     
-    keyA = Pin(PIN_A, Pin.IN, Pin.PULL_UP)
-    keyB = Pin(PIN_B, Pin.IN, Pin.PULL_UP)
-    
-    key2 = Pin(PIN_UP, Pin.IN, Pin.PULL_UP)
-    key3 = Pin(PIN_CTRL, Pin.IN, Pin.PULL_UP)
-    key4 = Pin(PIN_LEFT, Pin.IN, Pin.PULL_UP)
-    key5 = Pin(PIN_DOWN, Pin.IN, Pin.PULL_UP)
-    key6 = Pin(PIN_RIGHT, Pin.IN, Pin.PULL_UP)
-    
-    elapsed_time = 1000
-    f = FPS
+    # the buttons are read by interrupts, a press between two frames isn't lost
+    pad = Gamepad(((PIN_A, BUTTON_A), (PIN_B, BUTTON_B), (PIN_UP, BUTTON_UP), (PIN_CTRL, BUTTON_CTRL), (PIN_LEFT, BUTTON_LEFT), (PIN_DOWN, BUTTON_DOWN), (PIN_RIGHT, BUTTON_RIGHT)))
     
-    tiles = [
+    tiles = TileMap.from_rows([
         [-1,9,-1,-1,-1,11,-1], # top row
         [-1,-1,-1,-1,-1,2,10], # bottom row
-    ]
+    ])
     
     # clear the entire screen
     fb.fill(td.color(1))
+    fb.mark_dirty(0, 0, display_w, display_h)
     
     # paint the area that won't be updated
     for i in range(0, math.ceil(display_w/step)):
@@ -171,48 +172,61 @@ if __name__=='__main__':
     # report stat before entering draw loop
     micropython.mem_info()
     
-    while(1):
-        start_time = time.ticks_ms()
-        
-        # clear 3 rows above the ground
-        fb.fill_rect(0, display_h - 4 * step, display_w, 3 * step, td.color(1))
-            
-        if SHOW_FPS:
-            fb.text(f"{f} fps", int(display_w / 2), display_h - 4 * step, td.color(7))
-        
-        if(keyA.value() == 0): # a
+    profiler = Profiler(td, fb, fb)
+    if PROFILE:
+        profiler.enable()
+    
+    f = FPS
+    last_draw = time.ticks_ms()
+    
+    def update():
+        profiler.mark("sleep")
+        pad.poll()
+        # a button tapped since the last update counts as held once
+        keys = pad.held | pad.pressed
+        if keys & BUTTON_A: # a
             player.jump()
-        if(keyB.value() == 0): # b
+        if pad.pressed & BUTTON_B: # b, once per press
             player.autoplay = not player.autoplay
-        if(key2.value() == 0): # up
+        if keys & BUTTON_UP: # up
             player.move(0)
-        if(key3.value() == 0): # ctrl
+        if keys & BUTTON_CTRL: # ctrl
             player.move(0)
-        if(key4.value() == 0): # left
+        if keys & BUTTON_LEFT: # left
             player.move(-1)
-        if(key5.value() == 0): # down
+        if keys & BUTTON_DOWN: # down
             player.move(0)
-        if(key6.value() == 0): # right
+        if keys & BUTTON_RIGHT: # right
             player.move(1)
+        coin.update()
+        player.update()
+        profiler.mark("update")
+    
+    def draw():
+        global f, last_draw
+        # clear 3 rows above the ground
+        fb.fill_rect(0, display_h - 4 * step, display_w, 3 * step, td.color(1))
+        fb.mark_dirty(0, display_h - 4 * step, display_w, 3 * step)
+            
+        if SHOW_FPS:
+            now = time.ticks_ms()
+            elapsed_time = time.ticks_diff(now, last_draw)
+            last_draw = now
+            f = "{:.1f}".format(1000 / elapsed_time) if elapsed_time > 1000 / FPS + 1 else FPS
+            td.print(fb, f"{f} fps", display_w // 2, display_h - 4 * step, 7, 2)
         
         # draw tiles
-        for y in range(len(tiles)):
-            for x in range(len(tiles[0])):
-                if tiles[y][x] >= 0:
-                    td.spr(fb, tiles[y][x], x * 8 * td.zoom, display_h - 8 * td.zoom * 2 * len(tiles) + (y + 1) * 8 * td.zoom)
+        td.map(fb, tiles, 0, 0, 0, display_h - (tiles.h + 1) * step, display_w, tiles.h * step)
         coin.draw()
         player.draw()
+        profiler.mark("render")
         
         # ship the frame
         fb.show()
-        
-        # update fps
-        end_time = time.ticks_ms()
-        elapsed_time = time.ticks_diff(end_time, start_time)
-        frame_time = 1000 / FPS
-        if elapsed_time < frame_time:
-            time.sleep((frame_time - elapsed_time) / 1000)
-            f = FPS
-        elif SHOW_FPS:
-            f = "{:.1f}".format(1000 / elapsed_time)
-
+        profiler.mark("present")
+        profiler.frame()
+        if PROFILE and profiler.frame_count % FPS == 0:
+            print("\n".join(profiler.report()))
+    
+    # update the game FPS times per second, skip drawing when a frame takes too long
+    GameLoop(update, draw, FPS).run()
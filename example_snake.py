@@ -7,6 +7,9 @@ from machine import Pin, SPI, PWM
 import framebuf, time, random, micropython, math
 from lcd_1inch14 import LCD_1inch14
 from tinydrawer import TinyDrawer
+from tinydrawer.game_loop import GameLoop
+from tinydrawer.collision import Grid
+from tinydrawer.gamepad import Gamepad, BUTTON_A, BUTTON_B, BUTTON_UP, BUTTON_CTRL, BUTTON_LEFT, BUTTON_DOWN, BUTTON_RIGHT
 
 # setup for lcd_1inch14.py
 
@@ -70,6 +73,7 @@ td = TinyDrawer(
 0000000000000000000777700007700077777077007700000000000000000000
 """, display_w = display_w, display_h = display_h)
 td.zoom = 1
+td.set_cache(8192) # pre-render the sprites, then draw them with blit
 step = 8 * td.zoom
 
 # how many blocks for snake to move
@@ -80,6 +84,11 @@ start_x = display_w - nx * step
 start_y = display_h - bar_h - ny * step
 score = 0
 alive = True
+# the number of tails in every cell, so hits and free cells are found without scanning the tails
+grid = Grid(nx, ny)
+
+def cell(x, y):
+    return (x - start_x) // step, (y - start_y) // step
     
 class Apple:
     def __init__(self, fb):
@@ -88,9 +97,16 @@ class Apple:
     def draw(self):
         td.spr(fb, 0, self.x, self.y)
         
-    def reposition(self):
-        self.x = start_x + random.randint(0, nx - 1) * step
-        self.y = start_y + random.randint(0, ny - 1) * step
+    def reposition(self, head = None):
+        # the head isn't in the grid, so it is added while looking for a free cell
+        if head:
+            grid.add(*cell(*head))
+        free = grid.find_free(random.randint(0, nx * ny - 1))
+        if head:
+            grid.add(*cell(*head), -1)
+        if free:
+            self.x = start_x + free[0] * step
+            self.y = start_y + free[1] * step
         
 class Snake:
     def __init__(self, fb):
@@ -101,6 +117,7 @@ class Snake:
         self.di = -1
         alive = True
         self.tails = [[self.x, self.y]]
+        grid.add(*cell(self.x, self.y))
         self.tail_max = 4
     
     def change_direction(self, di):
@@ -111,19 +128,23 @@ class Snake:
             self.x, self.y = self.x0, self.y0
             self.tails = [[self.x, self.y]]
             self.tail_max = 4
-            apple.reposition()
+            grid.clear()
+            grid.add(*cell(self.x, self.y))
+            apple.reposition((self.x, self.y))
             score = 0
         if (di == 0 and self.di != 2) or (di == 1 and self.di != 3) or (di == 2 and self.di != 0) or (di == 3 and self.di != 1):
             self.di = di
             
-    def draw(self, apple):
+    def update(self, apple):
         global score, alive
         if alive:
             # update tails
             if len(self.tails) >= self.tail_max:
-                self.tails.pop(0)
+                t = self.tails.pop(0)
+                grid.add(*cell(t[0], t[1]), -1)
             if self.di >= 0:
                 self.tails.append([self.x, self.y])
+                grid.add(*cell(self.x, self.y))
             # update position
             if self.di == 0: # up
                 self.y -= step
@@ -144,17 +165,18 @@ class Snake:
                 self.y = start_y
             # eat apple
             if self.x == apple.x and self.y == apple.y:
-                apple.reposition()
+                apple.reposition((self.x, self.y))
                 score += 1
                 self.tail_max += 1
-    
+            # hit its tail, the last tail is where the head was, so it can't be hit
+            if self.di >= 0 and grid.get(*cell(self.x, self.y)):
+                alive = False
+
+    def draw(self):
         for idx, t in enumerate(self.tails):
             n = 2
             if idx == len(self.tails) - 1:
                 n = 1
-            elif self.x == t[0] and self.y == t[1]:
-                # hit its tail
-                alive = False
             # draw its head and tails
             td.spr(self.fb, n, t[0], t[1])
 
@@ -169,17 +191,8 @@ if __name__=='__main__':
     apple = Apple(fb)
     snake = Snake(fb)
     
-    keyA = Pin(PIN_A, Pin.IN, Pin.PULL_UP)
-    keyB = Pin(PIN_B, Pin.IN, Pin.PULL_UP)
-    
-    key2 = Pin(PIN_UP, Pin.IN, Pin.PULL_UP)
-    key3 = Pin(PIN_CTRL, Pin.IN, Pin.PULL_UP)
-    key4 = Pin(PIN_LEFT, Pin.IN, Pin.PULL_UP)
-    key5 = Pin(PIN_DOWN, Pin.IN, Pin.PULL_UP)
-    key6 = Pin(PIN_RIGHT, Pin.IN, Pin.PULL_UP)
-    
-    elapsed_time = 1000
-    f = FPS
+    # the buttons are read by interrupts, a press between two frames isn't lost
+    pad = Gamepad(((PIN_A, BUTTON_A), (PIN_B, BUTTON_B), (PIN_UP, BUTTON_UP), (PIN_CTRL, BUTTON_CTRL), (PIN_LEFT, BUTTON_LEFT), (PIN_DOWN, BUTTON_DOWN), (PIN_RIGHT, BUTTON_RIGHT)))
     
     # clear the entire screen
     fb.fill(td.color(0))
@@ -189,49 +202,56 @@ if __name__=='__main__':
     
     bar_step = 8 * (td.zoom + 1)
     
-    while(1):
-        start_time = time.ticks_ms()
-        if(keyB.value() == 0): # b
+    f = FPS
+    last_draw = time.ticks_ms()
+    
+    def update():
+        global score
+        pad.poll()
+        # a button tapped since the last update counts as held once
+        keys = pad.held | pad.pressed
+        if keys & BUTTON_B: # b
             score += 1
-        if(key2.value() == 0): # up
+        if keys & BUTTON_UP: # up
             snake.change_direction(0)
-        if(key4.value() == 0): # left
+        if keys & BUTTON_LEFT: # left
             snake.change_direction(3)
-        if(key5.value() == 0): # down
+        if keys & BUTTON_DOWN: # down
             snake.change_direction(2)
-        if(key6.value() == 0): # right
+        if keys & BUTTON_RIGHT: # right
             snake.change_direction(1)
-        
+        snake.update(apple)
+    
+    def draw():
+        global f, last_draw
         # clear the pixels inside the snake area
         fb.fill_rect(start_x, start_y, nx * step, ny * step, td.color(1))
         
         # draw actors
         apple.draw()
-        snake.draw(apple)
+        snake.draw()
                 
-        # increase the zoom level to draw score
-        td.zoom += 1
+        # draw score, the text is cached until the score changes
         fb.fill_rect(0, display_h - bar_step, bar_step * 3, bar_step, td.color(0))
+        td.print(fb, "{:02d}".format(score % 100), bar_step, display_h - bar_step, 7, 3)
+        
+        # increase the zoom level to draw the apple and game over
+        td.zoom += 1
         td.spr(fb, 0, 0, display_h - bar_step)
-        td.spr(fb, 8 + (score // 10) % 10, bar_step, display_h - bar_step)
-        td.spr(fb, 8 + score % 10, bar_step * 2, display_h - bar_step)
         if not alive:
             # draw game over
             td.spr(fb, 18, (display_w - bar_step * 4) // 2, (display_h - bar_step * 2) // 2, w = 4, h = 2)
         td.zoom -= 1
         
         if SHOW_FPS:
-            fb.text(f"{f} fps", start_x, start_y, td.color(7))
+            now = time.ticks_ms()
+            elapsed_time = time.ticks_diff(now, last_draw)
+            last_draw = now
+            f = "{:.1f}".format(1000 / elapsed_time) if elapsed_time > 1000 / FPS + 1 else FPS
+            td.print(fb, f"{f} fps", start_x, start_y, 7, 1)
         
         # ship the frame
         fb.show()
-        
-        # update fps
-        end_time = time.ticks_ms()
-        elapsed_time = time.ticks_diff(end_time, start_time)
-        frame_time = 1000 / FPS
-        if elapsed_time < frame_time:
-            time.sleep((frame_time - elapsed_time) / 1000)
-            f = FPS
-        elif SHOW_FPS:
-            f = "{:.1f}".format(1000 / elapsed_time)
+    
+    # update the game FPS times per second, skip drawing when a frame takes too long
+    GameLoop(update, draw, FPS).run()
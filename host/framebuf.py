@@ -0,0 +1,145 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+# A pure Python framebuf for running TinyDrawer with CPython, see host/shims.py.
+# Only the formats and methods used by TinyDrawer are supported, and text() draws nothing
+
+MONO_VLSB = 0
+RGB565 = 1
+GS4_HMSB = 2
+MONO_HLSB = 3
+MONO_HMSB = 4
+GS2_HMSB = 5
+GS8 = 6
+
+# bits per pixel of the supported formats
+BITS = {RGB565: 16, GS4_HMSB: 4, GS8: 8, MONO_HLSB: 1}
+
+class FrameBuffer:
+    def __init__(self, buffer, width: int, height: int, format: int, stride: int = None):
+        """
+        Create a frame buffer on top of a buffer, like framebuf.FrameBuffer
+
+        Args:
+            buffer (bytearray): The pixels
+            width (int): Width in pixels
+            height (int): Height in pixels
+            format (int): RGB565, GS4_HMSB, GS8 or MONO_HLSB
+            stride (int): The number of pixels between two rows, the width by default
+        """
+        if format not in (RGB565, GS4_HMSB, GS8, MONO_HLSB):
+            raise ValueError("invalid format")
+        if stride is None:
+            stride = width
+        # like MicroPython, the rows of packed formats start on a byte and the buffer must hold every row
+        bpp = BITS[format]
+        round_to = 8 // bpp if bpp < 8 else 1
+        stride = (stride + round_to - 1) // round_to * round_to
+        if height > 0 and ((height - 1) * stride + (width + round_to - 1) // round_to * round_to) * bpp // 8 > len(buffer):
+            raise ValueError("buffer too small")
+        self.fb_buffer = buffer
+        self.fb_width = width
+        self.fb_height = height
+        self.fb_format = format
+        self.fb_stride = stride
+
+    def get(self, x: int, y: int) -> int:
+        buffer = self.fb_buffer
+        format = self.fb_format
+        if format == MONO_HLSB:
+            return buffer[y * ((self.fb_stride + 7) // 8) + (x >> 3)] >> (7 - (x & 7)) & 1
+        i = x + y * self.fb_stride
+        if format == RGB565:
+            return buffer[i * 2] | buffer[i * 2 + 1] << 8
+        if format == GS4_HMSB:
+            b = buffer[i >> 1]
+            return b & 15 if i & 1 else b >> 4
+        return buffer[i]
+
+    def set(self, x: int, y: int, c: int):
+        buffer = self.fb_buffer
+        format = self.fb_format
+        if format == MONO_HLSB:
+            i = y * ((self.fb_stride + 7) // 8) + (x >> 3)
+            bit = 0x80 >> (x & 7)
+            buffer[i] = buffer[i] | bit if c & 1 else buffer[i] & ~bit
+            return
+        i = x + y * self.fb_stride
+        if format == RGB565:
+            buffer[i * 2] = c & 255
+            buffer[i * 2 + 1] = (c >> 8) & 255
+        elif format == GS4_HMSB:
+            b = buffer[i >> 1]
+            if i & 1:
+                buffer[i >> 1] = (b & 0xF0) | (c & 15)
+            else:
+                buffer[i >> 1] = (b & 0x0F) | (c & 15) << 4
+        else:
+            buffer[i] = c & 255
+
+    def pixel(self, x: int, y: int, c: int = None):
+        if not (0 <= x < self.fb_width and 0 <= y < self.fb_height):
+            return None
+        if c is None:
+            return self.get(x, y)
+        self.set(x, y, c)
+
+    def fill_rect(self, x: int, y: int, w: int, h: int, c: int):
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.fb_width), min(y + h, self.fb_height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        if self.fb_format == RGB565:
+            # whole rows at once, CPython is too slow for one pixel at a time
+            row = bytes((c & 255, (c >> 8) & 255)) * (x1 - x0)
+            buffer = self.fb_buffer
+            for yy in range(y0, y1):
+                i = (x0 + yy * self.fb_stride) * 2
+                buffer[i:i + len(row)] = row
+            return
+        for yy in range(y0, y1):
+            for xx in range(x0, x1):
+                self.set(xx, yy, c)
+
+    def fill(self, c: int):
+        self.fill_rect(0, 0, self.fb_width, self.fb_height, c)
+
+    def hline(self, x: int, y: int, w: int, c: int):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x: int, y: int, h: int, c: int):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x: int, y: int, w: int, h: int, c: int, f: bool = False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.fill_rect(x, y, w, 1, c)
+        self.fill_rect(x, y + h - 1, w, 1, c)
+        self.fill_rect(x, y, 1, h, c)
+        self.fill_rect(x + w - 1, y, 1, h, c)
+
+    def blit(self, source, x: int, y: int, key: int = -1, palette = None):
+        if isinstance(source, (tuple, list)):
+            source = FrameBuffer(*source)
+        # the key is compared after the palette translation, like MicroPython
+        for sy in range(max(0, -y), min(source.fb_height, self.fb_height - y)):
+            for sx in range(max(0, -x), min(source.fb_width, self.fb_width - x)):
+                c = source.get(sx, sy)
+                if palette is not None:
+                    c = palette.get(c, 0)
+                if c != key:
+                    self.set(x + sx, y + sy, c)
+
+    def scroll(self, xstep: int, ystep: int):
+        old = FrameBuffer(bytearray(self.fb_buffer), self.fb_width, self.fb_height, self.fb_format, self.fb_stride)
+        for yy in range(self.fb_height):
+            for xx in range(self.fb_width):
+                sx, sy = xx - xstep, yy - ystep
+                if 0 <= sx < self.fb_width and 0 <= sy < self.fb_height:
+                    self.set(xx, yy, old.get(sx, sy))
+
+    def text(self, s: str, x: int, y: int, c: int = 1):
+        pass
@@ -0,0 +1,78 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+# Mock machine module for running lcd_1inch14.py with CPython, see host/shims.py.
+# Pins remember their value and SPI counts the bytes written instead of sending them
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id: int, mode: int = -1, pull: int = -1, value: int = None):
+        self.id = id
+        self.mode = mode
+        # inputs with a pull-up read 1 until a test calls value(0)
+        self.level = 1 if pull == Pin.PULL_UP else 0
+        if value is not None:
+            self.level = value
+        self.handler = None
+
+    def __call__(self, value: int = None) -> int:
+        return self.value(value)
+
+    def value(self, value: int = None) -> int:
+        if value is None:
+            return self.level
+        level = 1 if value else 0
+        changed = level != self.level
+        self.level = level
+        # a test can press a button by setting the level of an input
+        if changed and self.handler is not None:
+            self.handler(self)
+
+    def irq(self, handler = None, trigger: int = 0, hard: bool = False):
+        self.handler = handler
+
+class SPI:
+    def __init__(self, id: int, baudrate: int = 1_000_000, **kwargs):
+        self.id = id
+        self.baudrate = baudrate
+        self.writes = 0
+        self.bytes_written = 0
+        # set to a list to keep a copy of every write
+        self.log = None
+
+    def write(self, buffer):
+        self.writes += 1
+        self.bytes_written += len(buffer)
+        if self.log is not None:
+            self.log.append(bytes(buffer))
+
+    def reset_counters(self):
+        self.writes = 0
+        self.bytes_written = 0
+
+class PWM:
+    def __init__(self, pin: Pin):
+        self.pin = pin
+
+    def freq(self, value: int = None):
+        pass
+
+    def duty_u16(self, value: int = None):
+        pass
+
+def freq(hz: int = None) -> int:
+    return 125_000_000
+
+def disable_irq() -> int:
+    return 0
+
+def enable_irq(state: int = 0):
+    pass
@@ -0,0 +1,16 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+# Mock micropython module for CPython, see host/shims.py.
+# There is no viper emitter, so TinyDrawer falls back to the Python drawing loops
+
+def const(value):
+    return value
+
+def native(f):
+    return f
+
+def mem_info(verbose: bool = False):
+    pass
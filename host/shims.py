@@ -0,0 +1,31 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+# Run TinyDrawer and lcd_1inch14.py on a computer with CPython:
+#
+#   import sys
+#   sys.path.insert(0, "host")
+#   import shims
+#   shims.install()
+
+import os, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def install():
+    """
+    Make framebuf, machine and micropython importable, add the MicroPython
+    functions of the time module, and add the repository and src/ to the import path
+    """
+    for path in (os.path.join(ROOT, "src"), ROOT, os.path.join(ROOT, "host")):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    if not hasattr(time, "ticks_us"):
+        time.ticks_us = lambda: time.perf_counter_ns() // 1000
+        time.ticks_ms = lambda: time.perf_counter_ns() // 1_000_000
+        time.ticks_diff = lambda end, start: end - start
+        time.ticks_add = lambda ticks, delta: ticks + delta
+        time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+        time.sleep_us = lambda us: time.sleep(us / 1_000_000)
@@ -4,12 +4,226 @@
 # ----------------------------------------------------------------------------
 
 from machine import Pin, SPI
-import framebuf
+from array import array
+import framebuf, time, _thread
+try:
+    import micropython
+
+    # Pack RGB565 pixels into 12-bit RGB444, 3 bytes for every 2 pixels
+    #   dst (bytearray): The RGB444 bytes, pairs * 3 bytes
+    #   src (bytearray): The RGB565 pixels, 2 bytes each with the high byte first
+    #   start (int): The byte index of the first pixel in src
+    #   pairs (int): The number of pixel pairs
+    @micropython.viper
+    def pack_rgb444(dst, src, start: int, pairs: int):
+        d = ptr8(dst)
+        s = ptr8(src)
+        i = start
+        j = 0
+        end = pairs * 3
+        while j < end:
+            a = (s[i] << 8) | s[i + 1]
+            b = (s[i + 2] << 8) | s[i + 3]
+            d[j] = ((a >> 8) & 0xF0) | ((a >> 7) & 15)
+            d[j + 1] = (((a >> 1) & 15) << 4) | (b >> 12)
+            d[j + 2] = (((b >> 7) & 15) << 4) | ((b >> 1) & 15)
+            i += 4
+            j += 3
+
+    # Expand 4-bit palette indices to RGB565 pixels through a lookup table
+    #   dst (bytearray): The RGB565 pixels, count * 2 bytes
+    #   src (bytearray): The GS4_HMSB pixels, the left pixel of a byte is the high nibble
+    #   start (int): The index of the first pixel in src
+    #   count (int): The number of pixels
+    #   lut (array): The RGB565 color of each index, array("H") of 16 colors
+    @micropython.viper
+    def expand_gs4(dst, src, start: int, count: int, lut):
+        d = ptr16(dst)
+        s = ptr8(src)
+        l = ptr16(lut)
+        p = start
+        end = start + count
+        j = 0
+        while p < end:
+            b = s[p >> 1]
+            if p & 1:
+                d[j] = l[b & 15]
+            else:
+                d[j] = l[b >> 4]
+            p += 1
+            j += 1
+
+    # Pack 4-bit palette indices into 12-bit RGB444 through a lookup table, 3 bytes for every 2 pixels
+    #   dst (bytearray): The RGB444 bytes, pairs * 3 bytes
+    #   src (bytearray): The GS4_HMSB pixels, the left pixel of a byte is the high nibble
+    #   start (int): The index of the first pixel in src
+    #   pairs (int): The number of pixel pairs
+    #   lut (array): The RGB444 color of each index, array("H") of 16 colors
+    @micropython.viper
+    def pack_gs4_444(dst, src, start: int, pairs: int, lut):
+        d = ptr8(dst)
+        s = ptr8(src)
+        l = ptr16(lut)
+        p = start
+        j = 0
+        end = pairs * 3
+        while j < end:
+            b = s[p >> 1]
+            if p & 1:
+                a = l[b & 15]
+                b = l[s[(p + 1) >> 1] >> 4]
+            else:
+                a = l[b >> 4]
+                b = l[b & 15]
+            d[j] = a >> 4
+            d[j + 1] = ((a & 15) << 4) | (b >> 8)
+            d[j + 2] = b & 0xFF
+            p += 2
+            j += 3
+except (ImportError, SyntaxError, AttributeError):
+    # CPython, or MicroPython firmware without the viper code emitter
+    pack_rgb444 = None
+    expand_gs4 = None
+    pack_gs4_444 = None
+
+class RP2DMA:
+    # SPI1 registers and the DMA request signal of its TX FIFO on the RP2040
+    SPI1_BASE = 0x4004_0000
+    SSPDR = 0x008
+    SSPSR = 0x00C
+    SSPSR_BSY = 0x10
+    DREQ_SPI1_TX = 18
+
+    def __init__(self):
+        """
+        Feed the SPI1 TX FIFO from memory using a DMA channel of the RP2040.
+        Any object with the same methods can replace it, e.g. a mock on a host machine
+        """
+        import rp2
+        from machine import mem32
+        self.mem32 = mem32
+        self.dma = rp2.DMA()
+        self.ctrl = self.dma.pack_ctrl(size=0, inc_write=False, treq_sel=self.DREQ_SPI1_TX)
+
+    def start(self, buffer):
+        """
+        Start sending the buffer, one byte per transfer
+
+        Args:
+            buffer (bytearray): The bytes to send
+        """
+        self.dma.config(read=buffer, write=self.SPI1_BASE + self.SSPDR, count=len(buffer), ctrl=self.ctrl, trigger=True)
+
+    def remaining(self) -> int:
+        """
+        Get the number of bytes that are not yet written to the TX FIFO
+
+        Returns:
+            int: The number of bytes left, 0 when the transfer is done
+        """
+        if not self.dma.active():
+            return 0
+        return self.dma.count
+
+    def busy(self) -> bool:
+        """
+        Check whether the SPI is still shifting out the last bytes after the transfer is done
+
+        Returns:
+            bool: True if the SPI is busy
+        """
+        return bool(self.mem32[self.SPI1_BASE + self.SSPSR] & self.SSPSR_BSY)
 
 class LCD_1inch14(framebuf.FrameBuffer):
-    def __init__(self, CS, RST, DC, MOSI, SCK, width: int = 240, height: int = 135, orientation: int = 0):
-        self.width = width
-        self.height = height
+    # MADCTL (0x36) parameter of each orientation
+    MADCTL = (0x70, 0xC0, 0xA0, 0x00)
+    # (axis, direction) of the hardware scrolling of each orientation, axis 0 scrolls x and 1 scrolls y.
+    # The ST7789 scrolls along its 320 gate lines, which are x in landscape and mirrored by MADCTL
+    SCROLL = ((0, 1), (1, -1), (0, -1), (1, 1))
+    MEMORY_LINES = 320
+    # (command, parameter bytes, delay in milliseconds) sent after MADCTL to initialize the ST7789
+    INIT_COMMANDS = (
+        (0x3A, b"\x05", 0), # COLMOD: 16-bit RGB565
+        (0xB2, b"\x0C\x0C\x00\x33\x33", 0), # PORCTRL: porch setting
+        (0xB7, b"\x35", 0), # GCTRL: gate control
+        (0xBB, b"\x19", 0), # VCOMS
+        (0xC0, b"\x2C", 0), # LCMCTRL
+        (0xC2, b"\x01", 0), # VDVVRHEN
+        (0xC3, b"\x12", 0), # VRHS
+        (0xC4, b"\x20", 0), # VDVS
+        (0xC6, b"\x0F", 0), # FRCTRL2: 60 Hz
+        (0xD0, b"\xA4\xA1", 0), # PWCTRL1
+        (0xE0, b"\xD0\x04\x0D\x11\x13\x2B\x3F\x54\x4C\x18\x0D\x0B\x1F\x23", 0), # PVGAMCTRL: positive gamma
+        (0xE1, b"\xD0\x04\x0C\x11\x13\x2C\x3F\x44\x51\x2F\x1F\x1F\x20\x23", 0), # NVGAMCTRL: negative gamma
+        (0x21, None, 0), # INVON
+        (0x11, None, 0), # SLPOUT
+        (0x29, None, 0), # DISPON
+    )
+
+    def __init__(self, CS, RST, DC, MOSI, SCK, width: int = 240, height: int = 135, orientation: int = 0, dirty_tracking: bool = False, dma = None, init_commands = None, scale: int = 1, buffered: bool = True, color_bits: int = 16, indexed: bool = False):
+        # with scale > 1, the frame buffer has 1 pixel for every scale x scale pixels of the display,
+        # rounded up so the last column and row cover the rest of the display and are cut when sent
+        self.scale = scale
+        self.display_width = width
+        self.display_height = height
+        self.width = (width + scale - 1) // scale
+        self.height = (height + scale - 1) // scale
+        # the 1.14" panel shows the middle of the controller's memory
+        if height > 135:
+            self.x_offset, self.y_offset = 0, 0
+        else:
+            self.x_offset, self.y_offset = 40, 53
+        # with dirty tracking, show() only sends the regions passed to mark_dirty()
+        self.dirty_tracking = dirty_tracking
+        self.dirty = []
+        self.max_dirty = 8
+        # show_async() sends the buffer with DMA, created on first use unless it is given
+        self.dma = dma
+        self.in_flight = False
+        self.in_flight_size = 0
+        # with color_bits = 12, the RGB565 pixels are packed into RGB444 while sending, 3 bytes for 2 pixels
+        self.color_bits = color_bits
+        if color_bits == 12:
+            self.line444 = bytearray((width + 1) // 2 * 3)
+            self.line444_mv = memoryview(self.line444)
+        # the RGB444 value of the first pixel after begin_write(), and of an unpaired pixel
+        self.first_pixel = -1
+        self.odd_pixel = -1
+        # with indexed = True, the frame buffer has a 4-bit palette index per pixel,
+        # expanded to RGB565 through the 16 colors of lut while sending
+        self.indexed = indexed
+        self.format = framebuf.GS4_HMSB if indexed else framebuf.RGB565
+        if indexed:
+            self.lut = array("H", [0] * 16)
+            # the 4 RGB565 bytes of every byte of 2 indices, for the Python loop
+            self.pairs = bytearray(1024)
+            if color_bits == 12:
+                # the indices are packed straight into RGB444, without expanding them to RGB565 first
+                self.lut444 = array("H", [0] * 16)
+                self.pairs444 = bytearray(768)
+            self.index_line = bytearray(self.width * 2)
+            self.index_line_mv = memoryview(self.index_line)
+            # GS4_HMSB rows start on a byte, so a row of an odd width has an unused pixel at the end
+            self.index_stride = (self.width + 1) & ~1
+        # a different ST7789 panel can pass its own command table
+        self.init_commands = init_commands or self.INIT_COMMANDS
+        self.cmd_buffer = bytearray(1)
+        self.data_buffer = bytearray(1)
+        # CASET and RASET parameters of the current window
+        self.window = None
+        self.caset = bytearray(4)
+        self.raset = bytearray(4)
+        # VSCRDEF and VSCSAD parameters, scroll_top is None until scroll_area() is called
+        self.vscrdef = bytearray(6)
+        self.vscsad = bytearray(2)
+        self.scroll_top = None
+        self.scroll_size = 0
+        self.scroll_offset = 0
+        if scale > 1:
+            # one row of the display, the scaled pixels of a row are written here before sending it scale times
+            self.line = bytearray(self.width * scale * 2)
+            self.line_mv = memoryview(self.line)
+            self.line_fb = framebuf.FrameBuffer(self.line, self.width * scale, 1, framebuf.RGB565)
         
         self.cs = Pin(CS, Pin.OUT)
         self.rst = Pin(RST, Pin.OUT)
@@ -18,146 +232,742 @@ class LCD_1inch14(framebuf.FrameBuffer):
         self.spi = SPI(1, 31_250_000, polarity = 0, phase = 0, sck = Pin(SCK), mosi = Pin(MOSI), miso = None)
         self.dc = Pin(DC, Pin.OUT)
         self.dc(1)
-        self.buffer = bytearray(self.height * self.width * 2)
-        super().__init__(self.buffer, self.width, self.height, framebuf.RGB565)
+        if buffered and indexed:
+            self.buffer = bytearray(self.index_stride // 2 * self.height)
+            super().__init__(self.buffer, self.width, self.height, framebuf.GS4_HMSB)
+        elif buffered:
+            self.buffer = bytearray(self.height * self.width * 2)
+            super().__init__(self.buffer, self.width, self.height, framebuf.RGB565)
+        else:
+            # the frame is streamed with send_rows(), for example by StripRenderer, so there is no frame buffer to draw on
+            self.buffer = bytearray(2)
+            super().__init__(self.buffer, 1, 1, framebuf.RGB565)
+        self.buffer_mv = memoryview(self.buffer)
         self.init_display(orientation)
         
-    def write_cmd(self, cmd):
+    def write_command(self, cmd: int, data = None):
+        """
+        Send a command and its parameters while the display is selected once
+
+        Args:
+            cmd (int): The command byte
+            data (bytes): The parameter bytes, or None
+        """
+        if self.in_flight:
+            self.wait_show()
+        self.cmd_buffer[0] = cmd
         self.cs(1)
         self.dc(0)
         self.cs(0)
-        self.spi.write(bytearray([cmd]))
+        self.spi.write(self.cmd_buffer)
+        if data:
+            self.dc(1)
+            self.spi.write(data)
         self.cs(1)
 
+    def write_cmd(self, cmd):
+        self.write_command(cmd)
+
     def write_data(self, buf):
+        self.data_buffer[0] = buf
         self.cs(1)
         self.dc(1)
         self.cs(0)
-        self.spi.write(bytearray([buf]))
+        self.spi.write(self.data_buffer)
         self.cs(1)
 
+    def write_commands(self, commands):
+        """
+        Send a table of (command, parameter bytes, delay in milliseconds) entries
+
+        Args:
+            commands (tuple): The command table
+        """
+        for cmd, data, delay in commands:
+            self.write_command(cmd, data)
+            if delay:
+                time.sleep_ms(delay)
+
     def init_display(self, orientation):
         self.rst(1)
         self.rst(0)
         self.rst(1)
-        
-        self.write_cmd(0x36)
-        if orientation == 0:
-            self.write_data(0x70)
-        elif orientation == 1:
-            self.write_data(0xC0)
-        elif orientation == 2:
-            self.write_data(0xA0)
+
+        self.orientation = orientation
+        madctl = self.MADCTL[orientation] if orientation in (0, 1, 2) else self.MADCTL[3]
+        self.write_command(0x36, bytes([madctl]))
+        self.write_commands(self.init_commands)
+        if self.color_bits == 12:
+            self.write_command(0x3A, b"\x03") # COLMOD: 12-bit RGB444
+        # the display forgets the window and the scrolling after a reset
+        self.window = None
+        self.scroll_top = None
+        self.scroll_offset = 0
+
+    def mark_dirty(self, x: int, y: int, w: int, h: int):
+        """
+        Mark a region as changed, so the next show() sends it to the display.
+        Overlapping and touching regions are merged. While show_async() is sending the buffer,
+        it first waits until the rows of the region are sent, so drawing after mark_dirty() is safe
+
+        Args:
+            x (int): The x position of the region
+            y (int): The y position of the region
+            w (int): Width of the region
+            h (int): Height of the region
+        """
+        if self.in_flight:
+            self.wait_region(y, h)
+        if not self.dirty_tracking:
+            return
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        dirty = self.dirty
+        i = 0
+        while i < len(dirty):
+            r = dirty[i]
+            if x0 <= r[2] and r[0] <= x1 and y0 <= r[3] and r[1] <= y1:
+                x0, y0 = min(x0, r[0]), min(y0, r[1])
+                x1, y1 = max(x1, r[2]), max(y1, r[3])
+                dirty.pop(i)
+                # the merged region may now touch a region that was checked already
+                i = 0
+            else:
+                i += 1
+        dirty.append((x0, y0, x1, y1))
+        if len(dirty) > self.max_dirty:
+            self.dirty = [(min(r[0] for r in dirty), min(r[1] for r in dirty), max(r[2] for r in dirty), max(r[3] for r in dirty))]
+
+    def set_window(self, x0: int, y0: int, x1: int, y1: int):
+        """
+        Set the display memory window for the next RAMWR, x1 and y1 are included.
+        Nothing is sent when the window is the same as the last one
+
+        Args:
+            x0 (int): The first column
+            y0 (int): The first row
+            x1 (int): The last column
+            y1 (int): The last row
+        """
+        window = (x0, y0, x1, y1)
+        if window == self.window:
+            return
+        self.window = window
+        x0 += self.x_offset
+        x1 += self.x_offset
+        y0 += self.y_offset
+        y1 += self.y_offset
+        caset, raset = self.caset, self.raset
+        caset[0], caset[1], caset[2], caset[3] = x0 >> 8, x0 & 0xFF, x1 >> 8, x1 & 0xFF
+        raset[0], raset[1], raset[2], raset[3] = y0 >> 8, y0 & 0xFF, y1 >> 8, y1 & 0xFF
+        self.write_command(0x2A, caset)
+        self.write_command(0x2B, raset)
+
+    def begin_write(self):
+        """
+        Send RAMWR and keep the display selected, so the following SPI writes go to the window.
+        Send the pixels with write_pixels() and call end_write() after the last write
+        """
+        self.write_command(0x2C)
+        self.dc(1)
+        self.cs(0)
+        self.first_pixel = -1
+        self.odd_pixel = -1
+
+    def end_write(self):
+        """
+        Finish the writes of begin_write() and release the display
+        """
+        odd = self.odd_pixel
+        if odd >= 0:
+            # 12-bit pixels are sent in pairs, the extra pixel wraps around to the first pixel of the window
+            first = self.first_pixel
+            line = self.line444
+            line[0] = odd >> 4
+            line[1] = (odd & 15) << 4 | first >> 8
+            line[2] = first & 0xFF
+            self.spi.write(self.line444_mv[:3])
+            self.odd_pixel = -1
+        self.cs(1)
+
+    def rgb444(self, buffer, i: int) -> int:
+        """
+        Get the RGB444 value of an RGB565 pixel
+
+        Args:
+            buffer (bytearray): The RGB565 pixels
+            i (int): The byte index of the pixel
+
+        Returns:
+            int: The 12-bit color
+        """
+        k = buffer[i] << 8 | buffer[i + 1]
+        return (k >> 12) << 8 | ((k >> 7) & 15) << 4 | (k >> 1) & 15
+
+    def write_pixels(self, buffer):
+        """
+        Send RGB565 pixels after begin_write(), packed into RGB444 with color_bits = 12
+
+        Args:
+            buffer (bytearray): The RGB565 pixels
+        """
+        if self.color_bits != 12:
+            self.spi.write(buffer)
+            return
+        n = len(buffer)
+        if n == 0:
+            return
+        i = 0
+        if self.first_pixel < 0:
+            self.first_pixel = self.rgb444(buffer, 0)
+        line = self.line444
+        line_mv = self.line444_mv
+        write = self.spi.write
+        odd = self.odd_pixel
+        if odd >= 0:
+            # pair the unpaired pixel of the last write with the first pixel of this one
+            c = self.rgb444(buffer, 0)
+            line[0] = odd >> 4
+            line[1] = (odd & 15) << 4 | c >> 8
+            line[2] = c & 0xFF
+            write(line_mv[:3])
+            i = 2
+        pairs = (n - i) // 4
+        max_pairs = len(line) // 3
+        rgb444 = self.rgb444
+        while pairs > 0:
+            count = min(pairs, max_pairs)
+            if pack_rgb444 is not None:
+                pack_rgb444(line, buffer, i, count)
+                i += count * 4
+            else:
+                j = 0
+                for _ in range(count):
+                    a = rgb444(buffer, i)
+                    b = rgb444(buffer, i + 2)
+                    line[j] = a >> 4
+                    line[j + 1] = (a & 15) << 4 | b >> 8
+                    line[j + 2] = b & 0xFF
+                    i += 4
+                    j += 3
+            write(line_mv[:count * 3])
+            pairs -= count
+        self.odd_pixel = rgb444(buffer, i) if i < n else -1
+
+    def set_palette(self, colors):
+        """
+        Set the 16 colors of the palette indices with indexed = True.
+        The frame isn't drawn again, the next show() sends it with the new colors
+
+        Args:
+            colors (list): The 16 RGB565 colors, such as TinyDrawer.colors
+        """
+        for i in range(16):
+            self.set_lut(i, colors[i])
+        for b in range(256):
+            self.set_pair(b)
+
+    def set_color(self, i: int, color: int):
+        """
+        Set the color of one palette index with indexed = True, for fades and flashes
+
+        Args:
+            i (int): The palette index [0,15]
+            color (int): The RGB565 color
+        """
+        self.set_lut(i, color)
+        for j in range(16):
+            self.set_pair(i << 4 | j)
+            self.set_pair(j << 4 | i)
+
+    def set_lut(self, i: int, color: int):
+        """
+        Write the color of a palette index to the lookup tables, without the pairs of set_pair()
+
+        Args:
+            i (int): The palette index [0,15]
+            color (int): The RGB565 color, stored with the low byte first like in the frame buffer
+        """
+        self.lut[i] = color
+        if self.color_bits == 12:
+            k = (color & 0xFF) << 8 | color >> 8
+            self.lut444[i] = (k >> 12) << 8 | ((k >> 7) & 15) << 4 | (k >> 1) & 15
+
+    def set_pair(self, b: int):
+        """
+        Write the RGB565 bytes of a byte of 2 palette indices for expand(),
+        and the RGB444 bytes for write_indices() with color_bits = 12
+
+        Args:
+            b (int): The byte, the high nibble is the left pixel
+        """
+        lut = self.lut
+        pairs = self.pairs
+        c0 = lut[b >> 4]
+        c1 = lut[b & 15]
+        k = b * 4
+        pairs[k] = c0 & 0xFF
+        pairs[k + 1] = c0 >> 8
+        pairs[k + 2] = c1 & 0xFF
+        pairs[k + 3] = c1 >> 8
+        if self.color_bits == 12:
+            lut444 = self.lut444
+            c0 = lut444[b >> 4]
+            c1 = lut444[b & 15]
+            k = b * 3
+            pairs444 = self.pairs444
+            pairs444[k] = c0 >> 4
+            pairs444[k + 1] = (c0 & 15) << 4 | c1 >> 8
+            pairs444[k + 2] = c1 & 0xFF
+
+    def expand(self, buffer, start: int, count: int):
+        """
+        Expand palette indices to RGB565 pixels through the palette, at most one row at a time
+
+        Args:
+            buffer (bytearray): The GS4_HMSB pixels of the frame
+            start (int): The index of the first pixel, y * index_stride + x
+            count (int): The number of pixels, up to the width of the frame
+
+        Returns:
+            memoryview: The RGB565 pixels, only valid until the next expand()
+        """
+        line = self.index_line
+        if expand_gs4 is not None:
+            expand_gs4(line, buffer, start, count, self.lut)
+            return self.index_line_mv[:count * 2]
+        lut = self.lut
+        pairs = self.pairs
+        p = start
+        end = start + count
+        j = 0
+        if p & 1:
+            c = lut[buffer[p >> 1] & 15]
+            line[0] = c & 0xFF
+            line[1] = c >> 8
+            p += 1
+            j = 2
+        while p + 1 < end:
+            k = buffer[p >> 1] * 4
+            line[j] = pairs[k]
+            line[j + 1] = pairs[k + 1]
+            line[j + 2] = pairs[k + 2]
+            line[j + 3] = pairs[k + 3]
+            p += 2
+            j += 4
+        if p < end:
+            c = lut[buffer[p >> 1] >> 4]
+            line[j] = c & 0xFF
+            line[j + 1] = c >> 8
+        return self.index_line_mv[:count * 2]
+
+    def write_indices(self, buffer, start: int, count: int):
+        """
+        Send palette indices after begin_write(), like write_pixels() with the pixels of expand().
+        With color_bits = 12, the indices are packed into RGB444 through the palette without expanding them
+
+        Args:
+            buffer (bytearray): The GS4_HMSB pixels of the frame
+            start (int): The index of the first pixel, y * index_stride + x
+            count (int): The number of pixels, up to the width of the frame
+        """
+        if self.color_bits != 12:
+            self.spi.write(self.expand(buffer, start, count))
+            return
+        if count <= 0:
+            return
+        lut = self.lut444
+        p = start
+        end = start + count
+        if self.first_pixel < 0:
+            self.first_pixel = lut[buffer[p >> 1] & 15 if p & 1 else buffer[p >> 1] >> 4]
+        line = self.line444
+        line_mv = self.line444_mv
+        write = self.spi.write
+        odd = self.odd_pixel
+        if odd >= 0:
+            # pair the unpaired pixel of the last write with the first pixel of this one
+            c = lut[buffer[p >> 1] & 15 if p & 1 else buffer[p >> 1] >> 4]
+            line[0] = odd >> 4
+            line[1] = (odd & 15) << 4 | c >> 8
+            line[2] = c & 0xFF
+            write(line_mv[:3])
+            p += 1
+        pairs = (end - p) // 2
+        max_pairs = len(line) // 3
+        pairs444 = self.pairs444
+        while pairs > 0:
+            n = min(pairs, max_pairs)
+            if pack_gs4_444 is not None:
+                pack_gs4_444(line, buffer, p, n, lut)
+                p += n * 2
+            elif p & 1:
+                # the pairs straddle the bytes of the frame
+                j = 0
+                for _ in range(n):
+                    a = lut[buffer[p >> 1] & 15]
+                    b = lut[buffer[(p + 1) >> 1] >> 4]
+                    line[j] = a >> 4
+                    line[j + 1] = (a & 15) << 4 | b >> 8
+                    line[j + 2] = b & 0xFF
+                    p += 2
+                    j += 3
+            else:
+                j = 0
+                for _ in range(n):
+                    k = buffer[p >> 1] * 3
+                    line[j] = pairs444[k]
+                    line[j + 1] = pairs444[k + 1]
+                    line[j + 2] = pairs444[k + 2]
+                    p += 2
+                    j += 3
+            write(line_mv[:n * 3])
+            pairs -= n
+        self.odd_pixel = lut[buffer[p >> 1] & 15 if p & 1 else buffer[p >> 1] >> 4] if p < end else -1
+
+    def send(self, buffer):
+        """
+        Send an entire frame to the display
+
+        Args:
+            buffer (bytearray): The pixels of the frame, the same size and format as self.buffer
+        """
+        if self.scale > 1:
+            self.send_scaled(buffer, 0, 0, self.width, self.height)
+            return
+        self.set_window(0, 0, self.width - 1, self.height - 1)
+        self.begin_write()
+        if self.indexed:
+            stride = self.index_stride
+            for start in range(0, stride * self.height, stride):
+                self.write_indices(buffer, start, self.width)
         else:
-            self.write_data(0x00)
-
-        self.write_cmd(0x3A) 
-        self.write_data(0x05)
-
-        self.write_cmd(0xB2)
-        self.write_data(0x0C)
-        self.write_data(0x0C)
-        self.write_data(0x00)
-        self.write_data(0x33)
-        self.write_data(0x33)
-
-        self.write_cmd(0xB7)
-        self.write_data(0x35) 
-
-        self.write_cmd(0xBB)
-        self.write_data(0x19)
-
-        self.write_cmd(0xC0)
-        self.write_data(0x2C)
-
-        self.write_cmd(0xC2)
-        self.write_data(0x01)
-
-        self.write_cmd(0xC3)
-        self.write_data(0x12)   
-
-        self.write_cmd(0xC4)
-        self.write_data(0x20)
-
-        self.write_cmd(0xC6)
-        self.write_data(0x0F) 
-
-        self.write_cmd(0xD0)
-        self.write_data(0xA4)
-        self.write_data(0xA1)
-
-        self.write_cmd(0xE0)
-        self.write_data(0xD0)
-        self.write_data(0x04)
-        self.write_data(0x0D)
-        self.write_data(0x11)
-        self.write_data(0x13)
-        self.write_data(0x2B)
-        self.write_data(0x3F)
-        self.write_data(0x54)
-        self.write_data(0x4C)
-        self.write_data(0x18)
-        self.write_data(0x0D)
-        self.write_data(0x0B)
-        self.write_data(0x1F)
-        self.write_data(0x23)
-
-        self.write_cmd(0xE1)
-        self.write_data(0xD0)
-        self.write_data(0x04)
-        self.write_data(0x0C)
-        self.write_data(0x11)
-        self.write_data(0x13)
-        self.write_data(0x2C)
-        self.write_data(0x3F)
-        self.write_data(0x44)
-        self.write_data(0x51)
-        self.write_data(0x2F)
-        self.write_data(0x1F)
-        self.write_data(0x1F)
-        self.write_data(0x20)
-        self.write_data(0x23)
-        
-        self.write_cmd(0x21)
+            self.write_pixels(buffer)
+        self.end_write()
 
-        self.write_cmd(0x11)
+    def send_rows(self, buffer, y: int, h: int):
+        """
+        Send full rows of the display from a buffer that only has those rows
 
-        self.write_cmd(0x29)
-        
-    def show(self):
-        if self.height > 135:
-            end_col = self.width - 1
-            end_page = self.height - 1
-
-            self.write_cmd(0x2A)
-            self.write_data((0x00))
-            self.write_data(0x00)
-            self.write_data((end_col >> 8) & 0xFF)
-            self.write_data(end_col & 0xFF)
-
-            self.write_cmd(0x2B)
-            self.write_data((0x00))
-            self.write_data(0x00)
-            self.write_data((end_page >> 8) & 0xFF)
-            self.write_data(end_page & 0xFF)
+        Args:
+            buffer (bytearray): The RGB565 pixels of the rows, width * h * 2 bytes
+            y (int): The first row
+            h (int): The number of rows
+        """
+        self.send_window(buffer, 0, y, self.width, h)
+
+    def send_window(self, buffer, x: int, y: int, w: int, h: int):
+        """
+        Send a region of the display from a buffer that only has that region
+
+        Args:
+            buffer (bytearray): The RGB565 pixels of the region row by row, w * h * 2 bytes
+            x (int): The x position of the region
+            y (int): The y position of the region
+            w (int): Width of the region
+            h (int): Height of the region
+        """
+        self.set_window(x, y, x + w - 1, y + h - 1)
+        self.begin_write()
+        self.write_pixels(buffer)
+        self.end_write()
+
+    def scroll_axis(self) -> tuple:
+        """
+        Get the direction of the hardware scrolling in the current orientation
+
+        Returns:
+            tuple: (axis, direction), axis 0 scrolls x and 1 scrolls y,
+                direction -1 when MADCTL mirrors the gate lines
+        """
+        return self.SCROLL[self.orientation] if self.orientation in (0, 1, 2) else self.SCROLL[3]
+
+    def scroll_area(self, start: int = 0, size: int = None):
+        """
+        Set the part of the display that scroll() moves with VSCRDEF (0x33), the rest stays fixed.
+        It is a range of columns in landscape and a range of rows in portrait, see scroll_axis()
+
+        Args:
+            start (int): The first column or row of the scrolling area
+            size (int): The number of columns or rows, or None for the rest of the display
+        """
+        axis, direction = self.scroll_axis()
+        length = self.width if axis == 0 else self.height
+        if size is None:
+            size = length - start
+        scale = self.scale
+        offset = self.x_offset if axis == 0 else self.y_offset
+        # the last scaled column or row may be cut by the edge of the display
+        end = min((start + size) * scale, self.display_width if axis == 0 else self.display_height)
+        start *= scale
+        size = end - start
+        if direction > 0:
+            top = offset + start
         else:
-            self.write_cmd(0x2A)
-            self.write_data(0)
-            self.write_data(0x28)
-            self.write_data(0x01)
-            self.write_data(0x17)
-            
-            self.write_cmd(0x2B)
-            self.write_data(0x00)
-            self.write_data(0x35)
-            self.write_data(0x00)
-            self.write_data(0xBB)
-        
-        self.write_cmd(0x2C)
-        
+            top = self.MEMORY_LINES - offset - start - size
+        bottom = self.MEMORY_LINES - top - size
+        vscrdef = self.vscrdef
+        vscrdef[0], vscrdef[1] = top >> 8, top & 0xFF
+        vscrdef[2], vscrdef[3] = size >> 8, size & 0xFF
+        vscrdef[4], vscrdef[5] = bottom >> 8, bottom & 0xFF
+        self.write_command(0x33, vscrdef)
+        self.scroll_top = top
+        self.scroll_size = size
+        self.scroll(0)
+
+    def scroll(self, offset: int):
+        """
+        Scroll the scrolling area in hardware with VSCSAD (0x37), nothing is sent again.
+        The column or row written at position p of the area is shown at p - offset, wrapping around,
+        so scrolling by the camera position shows the world column or row w written at w % size
+
+        Args:
+            offset (int): The number of columns or rows to scroll by
+        """
+        if self.scroll_top is None:
+            self.scroll_area()
+        _, direction = self.scroll_axis()
+        start = self.scroll_top + direction * offset * self.scale % self.scroll_size
+        self.vscsad[0], self.vscsad[1] = start >> 8, start & 0xFF
+        self.write_command(0x37, self.vscsad)
+        self.scroll_offset = offset
+
+    def send_scaled(self, buffer, x0: int, y0: int, x1: int, y1: int):
+        """
+        Send a region of a frame buffer with scale > 1, drawing each pixel as scale x scale pixels of the display.
+        Each row is scaled into the line buffer once, with one fill_rect for every run of the same color,
+        then the line buffer is sent scale times. x1 and y1 are excluded, and the last column and row
+        are cut at the edge of the display when its size isn't a multiple of scale
+
+        Args:
+            buffer (bytearray): The pixels of the frame, the same size and format as self.buffer
+            x0 (int): The left of the region
+            y0 (int): The top of the region
+            x1 (int): The right of the region
+            y1 (int): The bottom of the region
+        """
+        scale = self.scale
+        right = min(x1 * scale, self.display_width)
+        bottom = self.display_height
+        self.set_window(x0 * scale, y0 * scale, right - 1, min(y1 * scale, bottom) - 1)
+        self.begin_write()
+        line_fb = self.line_fb
+        line = self.line_mv[:(right - x0 * scale) * 2]
+        write = self.write_pixels
+        stride = self.width * 2
+        row = buffer
+        for y in range(y0, y1):
+            if self.indexed:
+                row = self.expand(buffer, y * self.index_stride + x0, x1 - x0)
+                i = 0
+                end = (x1 - x0) * 2
+            else:
+                i = y * stride + x0 * 2
+                end = y * stride + x1 * 2
+            x = 0
+            while i < end:
+                lo, hi = row[i], row[i + 1]
+                j = i + 2
+                while j < end and row[j] == lo and row[j + 1] == hi:
+                    j += 2
+                w = (j - i) // 2 * scale
+                line_fb.fill_rect(x, 0, w, 1, lo | hi << 8)
+                x += w
+                i = j
+            for _ in range(min(scale, bottom - y * scale)):
+                write(line)
+        self.end_write()
+
+    def show_async(self):
+        """
+        Start sending the entire buffer with DMA and return immediately.
+        TinyDrawer calls mark_dirty() before drawing a sprite, a text or a cached tile map, which waits for their rows.
+        Call wait_show() or wait_region() before drawing on the buffer in other ways
+        """
+        if self.in_flight:
+            self.wait_show()
+        if self.scale > 1 or self.color_bits == 12 or self.indexed:
+            # the scaled, packed or expanded rows are made while sending, so DMA can't send them on its own
+            self.send(self.buffer)
+            self.dirty = []
+            return
+        if self.dma is None:
+            self.dma = RP2DMA()
+        self.set_window(0, 0, self.width - 1, self.height - 1)
+        self.begin_write()
+        self.in_flight = True
+        self.in_flight_size = len(self.buffer)
+        self.dirty = []
+        self.dma.start(self.buffer)
+
+    def wait_show(self):
+        """
+        Wait until show_async() sent the entire buffer, then release the display
+        """
+        if not self.in_flight:
+            return
+        while self.dma.remaining():
+            pass
+        while self.dma.busy():
+            pass
         self.cs(1)
-        self.dc(1)
-        self.cs(0)
-            
-        self.spi.write(self.buffer)
-        self.cs(1)
\ No newline at end of file
+        self.in_flight = False
+
+    def wait_region(self, y: int, h: int):
+        """
+        Wait until show_async() sent the rows from y to y + h - 1, so they can be drawn again.
+        The buffer is sent from the top row to the bottom row
+
+        Args:
+            y (int): The first row
+            h (int): The number of rows
+        """
+        if not self.in_flight:
+            return
+        end = min(y + h, self.height) * self.width * 2
+        while self.in_flight_size - self.dma.remaining() < end:
+            pass
+        if end >= self.in_flight_size:
+            self.wait_show()
+
+    def show(self, full: bool = False):
+        """
+        Send the buffer to the display. With dirty tracking, only the marked regions are sent
+
+        Args:
+            full (bool): True to send the entire buffer
+        """
+        if full or not self.dirty_tracking:
+            self.send(self.buffer)
+        elif self.scale > 1:
+            for x0, y0, x1, y1 in self.dirty:
+                self.send_scaled(self.buffer, x0, y0, x1, y1)
+        else:
+            stride = self.width * 2
+            mv = self.buffer_mv
+            for x0, y0, x1, y1 in self.dirty:
+                self.set_window(x0, y0, x1 - 1, y1 - 1)
+                self.begin_write()
+                if self.indexed:
+                    for y in range(y0, y1):
+                        self.write_indices(self.buffer, y * self.index_stride + x0, x1 - x0)
+                elif x0 == 0 and x1 == self.width:
+                    # full rows are next to each other in the buffer
+                    self.write_pixels(mv[y0 * stride:y1 * stride])
+                else:
+                    for row in range(y0 * stride + x0 * 2, y1 * stride, stride):
+                        self.write_pixels(mv[row:row + (x1 - x0) * 2])
+                self.end_write()
+        self.dirty = []
+
+class BackBuffer(framebuf.FrameBuffer):
+    def __init__(self, buffer, width: int, height: int, format: int):
+        """
+        A frame buffer that keeps its pixels in buffer like LCD_1inch14, so TinyDrawer can draw on it with the compiled kernel
+
+        Args:
+            buffer (bytearray): The pixels
+            width (int): Width in pixels
+            height (int): Height in pixels
+            format (int): The framebuf format of the pixels
+        """
+        self.buffer = buffer
+        self.width = width
+        self.height = height
+        super().__init__(buffer, width, height, format)
+
+class DualCorePresenter:
+    def __init__(self, lcd: LCD_1inch14):
+        """
+        Double-buffer the display: core 1 sends a finished frame to the display while core 0 draws the next one.
+        This needs a second frame buffer of the same size as the display's buffer
+
+        Args:
+            lcd (LCD_1inch14): The display to send the frames to
+        """
+        self.lcd = lcd
+        self.buffers = [lcd.buffer, bytearray(len(lcd.buffer))]
+        self.frame_buffers = [lcd, BackBuffer(self.buffers[1], lcd.width, lcd.height, lcd.format)]
+        # core 0 draws into the back buffer
+        self.back = 1
+        self.fb = self.frame_buffers[1]
+        self.lock = _thread.allocate_lock()
+        # index of the buffer that core 1 has to send, -1 when core 1 is idle
+        self.pending = -1
+        self.running = False
+        self.frames = 0
+        # time in microseconds that core 0 waited for core 1 to finish sending, and core 1 waited for a frame
+        self.render_wait_us = 0
+        self.present_wait_us = 0
+        self.total_render_wait_us = 0
+        self.total_present_wait_us = 0
+
+    def start(self) -> framebuf.FrameBuffer:
+        """
+        Start sending frames on core 1
+
+        Returns:
+            framebuf.FrameBuffer: The frame buffer to draw the first frame
+        """
+        self.running = True
+        _thread.start_new_thread(self.run, ())
+        return self.fb
+
+    def stop(self):
+        """
+        Wait for the last frame to be sent, then stop core 1
+        """
+        self.wait()
+        with self.lock:
+            self.running = False
+
+    def wait(self) -> int:
+        """
+        Wait until core 1 finished sending its frame
+
+        Returns:
+            int: The time waited in microseconds
+        """
+        start = time.ticks_us()
+        while self.pending >= 0:
+            pass
+        return time.ticks_diff(time.ticks_us(), start)
+
+    def present(self) -> framebuf.FrameBuffer:
+        """
+        Swap the buffers: core 1 sends the frame that was just drawn, and core 0 draws the next frame in the other buffer.
+        The returned buffer still contains the frame before the last one
+
+        Returns:
+            framebuf.FrameBuffer: The frame buffer to draw the next frame
+        """
+        waited = self.wait()
+        with self.lock:
+            self.pending = self.back
+            self.render_wait_us = waited
+            self.total_render_wait_us += waited
+        self.back ^= 1
+        self.fb = self.frame_buffers[self.back]
+        return self.fb
+
+    def run(self):
+        """
+        The loop of core 1, started by start()
+        """
+        while True:
+            start = time.ticks_us()
+            while self.pending < 0 and self.running:
+                pass
+            waited = time.ticks_diff(time.ticks_us(), start)
+            with self.lock:
+                if not self.running:
+                    break
+                i = self.pending
+            self.lcd.send(self.buffers[i])
+            with self.lock:
+                self.pending = -1
+                self.frames += 1
+                self.present_wait_us = waited
+                self.total_present_wait_us += waited
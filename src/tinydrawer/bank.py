@@ -0,0 +1,65 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+# A sprite bank file stores a sprite buffer in binary:
+#   4 bytes  magic "TDSB"
+#   1 byte   format version
+#   1 byte   flags, bit 0 is set when 2 pixels are packed in each byte
+#   2 bytes  buffer_w, little-endian
+#   2 bytes  buffer_h, little-endian
+#   the pixels of the sprite buffer, row by row across the whole buffer
+
+import struct
+
+MAGIC = b"TDSB"
+VERSION = 1
+FLAG_PACKED = 1
+HEADER = "<4sBBHH"
+HEADER_SIZE = 10
+
+def read_header(f) -> tuple:
+    """
+    Read the header of a sprite bank file
+
+    Args:
+        f (file): The file opened in binary mode, positioned at the start
+
+    Returns:
+        tuple: (buffer_w, buffer_h, packed, size) where size is the number of pixel bytes, or None if it isn't a sprite bank
+    """
+    header = f.read(HEADER_SIZE)
+    if len(header) != HEADER_SIZE:
+        return None
+    magic, version, flags, buffer_w, buffer_h = struct.unpack(HEADER, header)
+    if magic != MAGIC or version != VERSION:
+        return None
+    packed = bool(flags & FLAG_PACKED)
+    size = 64 * buffer_w * buffer_h
+    if packed:
+        size //= 2
+    return buffer_w, buffer_h, packed, size
+
+def write_bank(path: str, hex_string: str, buffer_w: int = 8, buffer_h: int = 4) -> int:
+    """
+    Write a hex string from the Sprite Buffer Editor to a packed sprite bank file
+
+    Args:
+        path (str): The path of the sprite bank file
+        hex_string (str): A string representation of the sprite buffer, length must be 64 * buffer_w * buffer_h
+        buffer_w (int): A number of sprites the buffer can store horizontally
+        buffer_h (int): A number of sprites the buffer can store vertically
+
+    Returns:
+        int: The number of bytes written, or 0 if the hex string doesn't match the buffer size
+    """
+    hex_string = "".join(hex_string.split()).lower()
+    if len(hex_string) != 64 * buffer_w * buffer_h:
+        return 0
+    # every hex digit is one pixel, so the bytes are already packed
+    pixels = bytes.fromhex(hex_string)
+    with open(path, "wb") as f:
+        f.write(struct.pack(HEADER, MAGIC, VERSION, FLAG_PACKED, buffer_w, buffer_h))
+        f.write(pixels)
+    return HEADER_SIZE + len(pixels)
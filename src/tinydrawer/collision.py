@@ -0,0 +1,214 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+class Grid:
+    def __init__(self, w: int, h: int):
+        """
+        Create an occupancy grid of 1 byte per cell for tile or cell based games,
+        so checking a cell doesn't scan a list of positions
+
+        Args:
+            w (int): A number of cells horizontally
+            h (int): A number of cells vertically
+        """
+        self.w = w
+        self.h = h
+        self.cells = bytearray(w * h)
+
+    def clear(self):
+        """
+        Empty every cell
+        """
+        cells = self.cells
+        for i in range(len(cells)):
+            cells[i] = 0
+
+    def get(self, x: int, y: int) -> int:
+        """
+        Get the value of the cell at x,y
+
+        Args:
+            x (int): The column of the cell
+            y (int): The row of the cell
+
+        Returns:
+            int: The value of the cell, 0 for an empty cell or a cell outside the grid
+        """
+        if 0 <= x < self.w and 0 <= y < self.h:
+            return self.cells[y * self.w + x]
+        return 0
+
+    def set(self, x: int, y: int, v: int = 1) -> bool:
+        """
+        Set the value of the cell at x,y
+
+        Args:
+            x (int): The column of the cell
+            y (int): The row of the cell
+            v (int): The value [0,255], 0 for an empty cell
+
+        Returns:
+            bool: True if the cell is inside the grid
+        """
+        if 0 <= x < self.w and 0 <= y < self.h:
+            self.cells[y * self.w + x] = v
+            return True
+        return False
+
+    def add(self, x: int, y: int, v: int = 1) -> bool:
+        """
+        Add to the value of the cell at x,y, for cells that can be occupied more than once
+
+        Args:
+            x (int): The column of the cell
+            y (int): The row of the cell
+            v (int): The value to add, negative to remove
+
+        Returns:
+            bool: True if the cell is inside the grid
+        """
+        if 0 <= x < self.w and 0 <= y < self.h:
+            i = y * self.w + x
+            self.cells[i] = max(0, min(255, self.cells[i] + v))
+            return True
+        return False
+
+    def find_free(self, start: int = 0) -> tuple:
+        """
+        Find an empty cell, searching from the start index row by row and wrapping around
+
+        Args:
+            start (int): The index of the first cell to check, a random start gives a random empty cell
+
+        Returns:
+            tuple: The (x, y) of the empty cell, or None if every cell is occupied
+        """
+        cells = self.cells
+        n = len(cells)
+        if n == 0:
+            return None
+        i = start % n
+        for _ in range(n):
+            if cells[i] == 0:
+                return (i % self.w, i // self.w)
+            i += 1
+            if i == n:
+                i = 0
+        return None
+
+class Mask:
+    def __init__(self, w: int, h: int, rows: list):
+        """
+        The opaque pixels of a sprite, one int per row where the left pixel is the highest bit
+
+        Args:
+            w (int): Width in pixels
+            h (int): Height in pixels
+            rows (list): The h rows of w bits
+        """
+        self.w = w
+        self.h = h
+        self.rows = rows
+
+    def hit(self, x: int, y: int) -> bool:
+        """
+        Check a pixel of the mask
+
+        Args:
+            x (int): The x position in the mask
+            y (int): The y position in the mask
+
+        Returns:
+            bool: True if the pixel is opaque
+        """
+        if 0 <= x < self.w and 0 <= y < self.h:
+            return (self.rows[y] >> (self.w - 1 - x)) & 1 != 0
+        return False
+
+class Masks:
+    def __init__(self, td):
+        """
+        Make the collision masks of the sprites from the sprite buffer, at the zoom of the drawer.
+        Color 0 is transparent and pal() is ignored. The masks are kept until the sprite buffer changes
+
+        Args:
+            td (TinyDrawer): The drawer with the sprite buffer
+        """
+        self.td = td
+        self.masks = {}
+        self.version = td.buffer_version
+
+    def get(self, n: int, w: int = 1, h: int = 1, flip_x: bool = False, flip_y: bool = False) -> Mask:
+        """
+        Get the mask of the n sprite as it is drawn by spr()
+
+        Args:
+            n (int): The sprite index starting at 0
+            w (int): Width of the sprite (1 = 8 pixels)
+            h (int): Height of the sprite (1 = 8 pixels)
+            flip_x (bool): True to flip the sprite horizontally
+            flip_y (bool): True to flip the sprite vertically
+
+        Returns:
+            Mask: The mask in pixels of the display
+        """
+        td = self.td
+        if self.version != td.buffer_version:
+            self.masks = {}
+            self.version = td.buffer_version
+        zoom = td.zoom
+        key = (n, w, h, flip_x, flip_y, zoom)
+        mask = self.masks.get(key)
+        if mask is not None:
+            return mask
+        w8, h8 = w * 8, h * 8
+        bx0 = (n % td.buffer_w) * 8
+        by0 = (n // td.buffer_w) * 8
+        sget = td.sget
+        # one bit of the zoomed row for every pixel of the sprite
+        block = (1 << zoom) - 1
+        rows = []
+        for j in range(h8):
+            by = by0 + (h8 - 1 - j if flip_y else j)
+            row = 0
+            for i in range(w8):
+                row <<= zoom
+                if sget(bx0 + (w8 - 1 - i if flip_x else i), by) != 0:
+                    row |= block
+            for _ in range(zoom):
+                rows.append(row)
+        mask = Mask(w8 * zoom, h8 * zoom, rows)
+        self.masks[key] = mask
+        return mask
+
+def overlap(a: Mask, ax: int, ay: int, b: Mask, bx: int, by: int) -> bool:
+    """
+    Check if two masks have an opaque pixel at the same position, the bounding boxes are checked first
+
+    Args:
+        a (Mask): The first mask
+        ax (int): The x position of the first mask
+        ay (int): The y position of the first mask
+        b (Mask): The second mask
+        bx (int): The x position of the second mask
+        by (int): The y position of the second mask
+
+    Returns:
+        bool: True if the masks overlap
+    """
+    if ax >= bx + b.w or bx >= ax + a.w or ay >= by + b.h or by >= ay + a.h:
+        return False
+    # the bits of b moved to the columns of a
+    shift = a.w - b.w + ax - bx
+    a_rows, b_rows = a.rows, b.rows
+    for y in range(max(ay, by), min(ay + a.h, by + b.h)):
+        ra = a_rows[y - ay]
+        rb = b_rows[y - by]
+        if shift >= 0:
+            if ra & (rb << shift):
+                return True
+        elif (ra << -shift) & rb:
+            return True
+    return False
@@ -0,0 +1,34 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+# A 3 by 5 pixels font. Each glyph is 2 bytes holding 15 bits, the top row first
+# and the left pixel of a row in the highest bit. Lowercase letters use the uppercase glyphs
+
+GLYPH_W = 3
+GLYPH_H = 5
+
+CHARS = " !\"#%'()*+,-./0123456789:;<=>?ABCDEFGHIJKLMNOPQRSTUVWXYZ_"
+
+GLYPHS = bytes.fromhex(
+    "000024825a005f7d52a524001491449455d505d0001401c0000212a47b6f6497"
+    "73e772cf5bc979cf49ef72497bef7bc90410041415110e38445472c27bed7baf"
+    "39236b6e79a779a4392f5bed749774965bad49277f6d6b6d3b6e7be42b737bad"
+    "39ce74925b6b5b7a5b7f5aad5bcf72a70007"
+)
+
+def glyph(char: str) -> int:
+    """
+    Get the pixels of a character
+
+    Args:
+        char (str): The character
+
+    Returns:
+        int: The 15 bits of the glyph, 0 for a space or a character without a glyph
+    """
+    i = CHARS.find(char.upper())
+    if i < 0:
+        return 0
+    return GLYPHS[2 * i] << 8 | GLYPHS[2 * i + 1]
@@ -0,0 +1,114 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+from time import ticks_us, ticks_diff, sleep_us
+
+class GameLoop:
+    def __init__(self, update, draw, fps: int = 30, max_skip: int = 4):
+        """
+        Run a game at a fixed speed: update() is called fps times per second no matter how long drawing takes.
+        When a frame takes too long, the next frames skip draw() and only call update() to catch up
+
+        Args:
+            update (function): Called with no arguments to move the game forward by one step
+            draw (function): Called with no arguments to draw and show the game
+            fps (int): The number of update() calls per second
+            max_skip (int): The maximum number of update() calls without a draw(), the game slows down beyond it
+        """
+        self.update = update
+        self.draw = draw
+        self.max_skip = max_skip
+        self.set_fps(fps)
+        self.running = False
+        self.reset_stats()
+
+    def set_fps(self, fps: int):
+        """
+        Change the number of update() calls per second
+
+        Args:
+            fps (int): The number of update() calls per second
+        """
+        self.fps = fps
+        self.step_us = 1_000_000 // fps
+
+    def reset_stats(self):
+        """
+        Reset the counters and the jitter statistics
+        """
+        self.frames = 0
+        self.updates = 0
+        self.skipped = 0
+        self.dropped_us = 0
+        # how far each draw() started from its ideal time, in microseconds
+        self.jitter_us = 0
+        self.max_jitter_us = 0
+        self.total_jitter_us = 0
+        self.last_draw = None
+
+    def average_jitter_us(self) -> int:
+        """
+        Get the average distance between the time draw() started and its ideal time
+
+        Returns:
+            int: The average jitter in microseconds
+        """
+        return self.total_jitter_us // self.frames if self.frames > 1 else 0
+
+    def start(self):
+        """
+        Start the clock, the first tick() updates and draws immediately
+        """
+        self.last = ticks_us()
+        self.lag = self.step_us
+        self.running = True
+
+    def stop(self):
+        """
+        Make run() return after the current frame, for example from update()
+        """
+        self.running = False
+
+    def tick(self):
+        """
+        Call update() for every step that passed, draw() once if the game moved, then sleep until the next step
+        """
+        step = self.step_us
+        now = ticks_us()
+        self.lag += ticks_diff(now, self.last)
+        self.last = now
+        n = 0
+        while self.lag >= step and n < self.max_skip:
+            self.update()
+            self.lag -= step
+            n += 1
+        if self.lag >= step:
+            # too far behind, slow the game down instead of never drawing again
+            self.dropped_us += self.lag - self.lag % step
+            self.lag %= step
+        if n:
+            self.updates += n
+            self.skipped += n - 1
+            start = ticks_us()
+            if self.last_draw is not None:
+                jitter = abs(ticks_diff(start, self.last_draw) - n * step)
+                self.jitter_us = jitter
+                self.total_jitter_us += jitter
+                if jitter > self.max_jitter_us:
+                    self.max_jitter_us = jitter
+            self.last_draw = start
+            self.draw()
+            self.frames += 1
+        wait = step - self.lag - ticks_diff(ticks_us(), self.last)
+        if wait > 0:
+            sleep_us(wait)
+
+    def run(self):
+        """
+        Run the game until stop() is called
+        """
+        self.start()
+        while self.running:
+            self.tick()
@@ -0,0 +1,157 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+from array import array
+from machine import Pin, disable_irq, enable_irq
+from time import ticks_ms, ticks_diff
+
+BUTTON_A = 1
+BUTTON_B = 2
+BUTTON_UP = 4
+BUTTON_CTRL = 8
+BUTTON_LEFT = 16
+BUTTON_DOWN = 32
+BUTTON_RIGHT = 64
+
+# (pin, button) of Waveshare's Pico LCD 1.14, the joystick press is CTRL
+WAVESHARE_PINS = (
+    (15, BUTTON_A),
+    (17, BUTTON_B),
+    (2, BUTTON_UP),
+    (3, BUTTON_CTRL),
+    (16, BUTTON_LEFT),
+    (18, BUTTON_DOWN),
+    (20, BUTTON_RIGHT),
+)
+
+# set in an event when the button is pressed, the other bits are the index of the button
+PRESSED = 0x80
+
+class Gamepad:
+    def __init__(self, pins: tuple = WAVESHARE_PINS, debounce_ms: int = 10, size: int = 32, hard: bool = False):
+        """
+        Read buttons with pin interrupts instead of checking every pin in every frame.
+        A button connects its pin to the ground when pressed, the pins use the internal pull-up
+
+        Args:
+            pins (tuple): The (pin, button) pairs, a button is a bit such as BUTTON_A
+            debounce_ms (int): Changes of a button sooner than this after the last change are bouncing
+            size (int): The number of presses and releases kept until events() reads them
+            hard (bool): True to run the handlers as hard interrupts, they don't allocate memory
+        """
+        self.buttons = array("B", [button for _, button in pins])
+        self.debounce_ms = debounce_ms
+        self.last_change = array("I", [0] * len(pins))
+        # buttons down according to the interrupts, and the changes since the last poll()
+        self.state = 0
+        self.down = 0
+        self.up = 0
+        # buttons whose last change was ignored as bouncing, poll() reads them again
+        self.unsettled = 0
+        # ring buffer of events, written by the handlers and read by events()
+        self.queue = bytearray(size)
+        self.head = 0
+        self.tail = 0
+        self.overflows = 0
+        # the snapshot of the last poll()
+        self.held = 0
+        self.pressed = 0
+        self.released = 0
+        self.pins = []
+        handle = self.handle
+        for i, (pin_id, _) in enumerate(pins):
+            pin = Pin(pin_id, Pin.IN, Pin.PULL_UP)
+            if not pin.value():
+                self.state |= self.buttons[i]
+            pin.irq(self.handler(handle, i), Pin.IRQ_FALLING | Pin.IRQ_RISING, hard = hard)
+            self.pins.append(pin)
+
+    def handler(self, handle, i: int):
+        """
+        Create the interrupt handler of the i button
+
+        Args:
+            handle (function): The bound handle() method, created once so the handler doesn't allocate it
+            i (int): The index of the button
+
+        Returns:
+            function: The handler for Pin.irq()
+        """
+        def irq(pin):
+            handle(pin, i)
+        return irq
+
+    def handle(self, pin: Pin, i: int):
+        """
+        Record a change of the i button and queue the event. Called by the interrupt handlers,
+        so it only changes numbers and doesn't allocate memory
+
+        Args:
+            pin (machine.Pin): The pin of the button
+            i (int): The index of the button
+        """
+        bit = self.buttons[i]
+        pressed = not pin.value()
+        if pressed == ((self.state & bit) != 0):
+            return
+        now = ticks_ms()
+        if ticks_diff(now, self.last_change[i]) < self.debounce_ms:
+            self.unsettled |= bit
+            return
+        self.last_change[i] = now
+        self.state ^= bit
+        if pressed:
+            self.down |= bit
+        else:
+            self.up |= bit
+        head = (self.head + 1) % len(self.queue)
+        if head == self.tail:
+            self.overflows += 1
+            return
+        self.queue[self.head] = i | PRESSED if pressed else i
+        self.head = head
+
+    def poll(self) -> int:
+        """
+        Take a snapshot of the buttons, call it once per frame. Afterward,
+        held has the buttons that are down, pressed has the buttons pressed since the last poll(),
+        and released has the buttons released since the last poll(). A button tapped between
+        two frames is in pressed and released but not in held
+
+        Returns:
+            int: The buttons that are down
+        """
+        if self.unsettled:
+            # a button that bounced may have ended in a different state than the interrupts saw
+            now = ticks_ms()
+            for i, pin in enumerate(self.pins):
+                bit = self.buttons[i]
+                if self.unsettled & bit and ticks_diff(now, self.last_change[i]) >= self.debounce_ms:
+                    irq = disable_irq()
+                    self.unsettled &= ~bit
+                    self.handle(pin, i)
+                    enable_irq(irq)
+        irq = disable_irq()
+        state, down, up = self.state, self.down, self.up
+        self.down = 0
+        self.up = 0
+        enable_irq(irq)
+        self.held = state
+        self.pressed = down
+        self.released = up
+        return state
+
+    def events(self):
+        """
+        Read the presses and releases in the order they happened, since the last call
+
+        Returns:
+            generator: (button, pressed) pairs, pressed is True when the button went down
+        """
+        queue = self.queue
+        while self.tail != self.head:
+            event = queue[self.tail]
+            self.tail = (self.tail + 1) % len(queue)
+            yield self.buttons[event & ~PRESSED], (event & PRESSED) != 0
@@ -0,0 +1,101 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+# Compiled drawing kernels. Importing this module fails on CPython and on
+# firmware without the viper code emitter, then TinyDrawer uses Python loops
+
+import micropython
+
+# layout of the params array passed to spr_kernel
+P_DST_W = 0     # width of the target buffer in pixels
+P_CLIP_X0 = 1   # pixels are only written inside the clip area, x1 and y1 are excluded
+P_CLIP_Y0 = 2
+P_CLIP_X1 = 3
+P_CLIP_Y1 = 4
+P_X = 5         # position of the sprite on the target
+P_Y = 6
+P_W = 7         # size of the sprite in pixels of the sprite buffer
+P_H = 8
+P_ZOOM = 9
+P_FLIP_X = 10
+P_FLIP_Y = 11
+P_SRC = 12      # index of the top-left pixel of the sprite in the sprite buffer
+P_ROW_W = 13    # width of the sprite buffer in pixels
+P_PACKED = 14   # 1 if the sprite buffer stores 2 pixels per byte
+P_DRAWN = 15    # bit c is set if color c is drawn
+P_SIZE = 16
+
+# Draw a sprite by writing RGB565 pixels straight into the target buffer
+#   dst (bytearray): The RGB565 pixels of the target
+#   src (bytes): The pixels of the sprite buffer
+#   params (array): The P_SIZE int parameters listed above
+#   colors (array): The RGB565 color of each color index, after replacing colors
+@micropython.viper
+def spr_kernel(dst, src, params, colors):
+    d = ptr16(dst)
+    s = ptr8(src)
+    p = ptr32(params)
+    lut = ptr16(colors)
+    dst_w = p[0]
+    clip_x0 = p[1]
+    clip_y0 = p[2]
+    clip_x1 = p[3]
+    clip_y1 = p[4]
+    x = p[5]
+    y = p[6]
+    w = p[7]
+    h = p[8]
+    zoom = p[9]
+    flip_x = p[10]
+    flip_y = p[11]
+    src_start = p[12]
+    row_w = p[13]
+    packed = p[14]
+    drawn = p[15]
+    by = 0
+    while by < h:
+        if flip_y:
+            y0 = y + (h - 1 - by) * zoom
+        else:
+            y0 = y + by * zoom
+        y1 = y0 + zoom
+        if y0 < clip_y0:
+            y0 = clip_y0
+        if y1 > clip_y1:
+            y1 = clip_y1
+        if y0 < y1:
+            i = src_start + by * row_w
+            bx = 0
+            while bx < w:
+                if packed:
+                    b = int(s[i >> 1])
+                    if i & 1:
+                        c = b & 15
+                    else:
+                        c = b >> 4
+                else:
+                    c = int(s[i])
+                if (drawn >> c) & 1:
+                    color = int(lut[c])
+                    if flip_x:
+                        x0 = x + (w - 1 - bx) * zoom
+                    else:
+                        x0 = x + bx * zoom
+                    x1 = x0 + zoom
+                    if x0 < clip_x0:
+                        x0 = clip_x0
+                    if x1 > clip_x1:
+                        x1 = clip_x1
+                    yy = y0
+                    while yy < y1:
+                        row = yy * dst_w
+                        xx = x0
+                        while xx < x1:
+                            d[row + xx] = color
+                            xx += 1
+                        yy += 1
+                i += 1
+                bx += 1
+        by += 1
@@ -0,0 +1,214 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+from array import array
+from time import ticks_us, ticks_diff
+
+COUNTERS = ("spr", "pixels", "fill_rect", "blit", "spi_bytes")
+
+class CountingSPI:
+    def __init__(self, spi, counts: dict):
+        """
+        Forward the writes to an SPI bus while counting the bytes written
+
+        Args:
+            spi (machine.SPI): The SPI bus of the display
+            counts (dict): The counters of the profiler
+        """
+        self.spi = spi
+        self.counts = counts
+
+    def write(self, buffer):
+        self.counts["spi_bytes"] += len(buffer)
+        self.spi.write(buffer)
+
+class Profiler:
+    def __init__(self, td = None, fb = None, lcd = None, frames: int = 60, bucket_us: int = 4000, buckets: int = 16):
+        """
+        Count the drawing calls and time the phases of every frame.
+        Nothing is replaced until enable() is called, so a disabled profiler doesn't slow down drawing
+
+        Args:
+            td (TinyDrawer): The drawer to count the sprites and pixels of
+            fb (framebuf.FrameBuffer): The frame buffer to count the fill_rect and blit calls of,
+                it must be a Python class such as LCD_1inch14
+            lcd (LCD_1inch14): The display to count the bytes sent to
+            frames (int): The number of recent frame times kept for the average, the maximum and the histogram
+            bucket_us (int): The width of a histogram bucket in microseconds
+            buckets (int): The number of histogram buckets, the last one counts every longer frame
+        """
+        self.td = td
+        self.fb = fb
+        self.lcd = lcd
+        self.enabled = False
+        # counters of the current frame, and of the last finished frame
+        self.counts = {}
+        self.last = {}
+        for name in COUNTERS:
+            self.counts[name] = 0
+            self.last[name] = 0
+        # microseconds spent in each phase passed to mark()
+        self.phases = {}
+        self.last_phases = {}
+        self.frame_times = array("I", [0] * frames)
+        self.frame_index = 0
+        self.frame_count = 0
+        self.bucket_us = bucket_us
+        self.histogram = array("I", [0] * buckets)
+        self.frame_start = 0
+        self.mark_start = 0
+
+    def enable(self):
+        """
+        Start counting by replacing the drawing methods of td, fb and lcd with counting ones
+        """
+        if self.enabled:
+            return
+        counts = self.counts
+        td = self.td
+        if td is not None:
+            spr_clip = td.spr_clip
+            def counting_spr_clip(fb, n, x, y, w, h, flip_x, flip_y, clip, fb_clip = False):
+                counts["spr"] += 1
+                size = 8 * td.zoom
+                visible_w = min(x + w * size, clip[2]) - max(x, clip[0])
+                visible_h = min(y + h * size, clip[3]) - max(y, clip[1])
+                if visible_w > 0 and visible_h > 0:
+                    counts["pixels"] += visible_w * visible_h
+                spr_clip(fb, n, x, y, w, h, flip_x, flip_y, clip, fb_clip)
+            # spr(), map(), SpriteBatch and StripRenderer all draw through spr_clip()
+            td.spr_clip = counting_spr_clip
+        fb = self.fb
+        if fb is not None:
+            fill_rect = fb.fill_rect
+            blit = fb.blit
+            def counting_fill_rect(x, y, w, h, c):
+                counts["fill_rect"] += 1
+                fill_rect(x, y, w, h, c)
+            def counting_blit(*args):
+                counts["blit"] += 1
+                blit(*args)
+            fb.fill_rect = counting_fill_rect
+            fb.blit = counting_blit
+        lcd = self.lcd
+        if lcd is not None:
+            lcd.spi = CountingSPI(lcd.spi, counts)
+            show_async = lcd.show_async
+            def counting_show_async():
+                show_async()
+                # DMA reads the buffer without going through spi.write()
+                if lcd.in_flight:
+                    counts["spi_bytes"] += lcd.in_flight_size
+            lcd.show_async = counting_show_async
+        self.enabled = True
+        self.frame_start = self.mark_start = ticks_us()
+
+    def disable(self):
+        """
+        Stop counting and put the original drawing methods back
+        """
+        if not self.enabled:
+            return
+        if self.td is not None:
+            del self.td.spr_clip
+        if self.fb is not None:
+            del self.fb.fill_rect
+            del self.fb.blit
+        if self.lcd is not None:
+            self.lcd.spi = self.lcd.spi.spi
+            del self.lcd.show_async
+        self.enabled = False
+
+    def mark(self, phase: str):
+        """
+        Add the time since the start of the frame or the last mark() to a phase, for example
+        mark("update") after updating the game and mark("render") after drawing it
+
+        Args:
+            phase (str): The name of the phase
+        """
+        if not self.enabled:
+            return
+        now = ticks_us()
+        self.phases[phase] = self.phases.get(phase, 0) + ticks_diff(now, self.mark_start)
+        self.mark_start = now
+
+    def frame(self):
+        """
+        Finish the current frame and start the next one. Call it once at the start of the game loop
+        """
+        if not self.enabled:
+            return
+        now = ticks_us()
+        elapsed = ticks_diff(now, self.frame_start)
+        frame_times = self.frame_times
+        histogram = self.histogram
+        last_bucket = len(histogram) - 1
+        if self.frame_count >= len(frame_times):
+            # the oldest frame time leaves the window, and its bucket
+            histogram[min(frame_times[self.frame_index] // self.bucket_us, last_bucket)] -= 1
+        frame_times[self.frame_index] = elapsed
+        self.frame_index = (self.frame_index + 1) % len(frame_times)
+        self.frame_count += 1
+        histogram[min(elapsed // self.bucket_us, last_bucket)] += 1
+        counts, last = self.counts, self.last
+        for name in counts:
+            last[name] = counts[name]
+            counts[name] = 0
+        phases, last_phases = self.phases, self.last_phases
+        for name in phases:
+            last_phases[name] = phases[name]
+            phases[name] = 0
+        self.frame_start = self.mark_start = now
+
+    def average_us(self) -> int:
+        """
+        Get the average time of the recent frames
+
+        Returns:
+            int: The average frame time in microseconds
+        """
+        n = min(self.frame_count, len(self.frame_times))
+        if n == 0:
+            return 0
+        return sum(self.frame_times[i] for i in range(n)) // n
+
+    def max_us(self) -> int:
+        """
+        Get the longest time of the recent frames
+
+        Returns:
+            int: The longest frame time in microseconds
+        """
+        n = min(self.frame_count, len(self.frame_times))
+        return max(self.frame_times[i] for i in range(n)) if n else 0
+
+    def report(self) -> list:
+        """
+        Describe the last frame, the recent frame times and the histogram, for example print("\\n".join(report()))
+
+        Returns:
+            list: The lines of the report
+        """
+        average = self.average_us()
+        lines = ["frame avg {:.1f}ms max {:.1f}ms fps {:.1f}".format(average / 1000, self.max_us() / 1000, 1_000_000 / average if average else 0)]
+        lines.append(" ".join("{} {:.1f}ms".format(name, us / 1000) for name, us in self.last_phases.items()))
+        lines.append(" ".join("{} {}".format(name, self.last[name]) for name in COUNTERS))
+        lines.append("hist {}ms: {}".format(self.bucket_us // 1000, " ".join(str(n) for n in self.histogram)))
+        return lines
+
+    def draw(self, fb, x: int = 0, y: int = 0, c: int = 0xFFFF):
+        """
+        Draw the report on a frame buffer, one line every 10 pixels
+
+        Args:
+            fb (framebuf.FrameBuffer): The frame buffer to draw on
+            x (int): The x position of the report
+            y (int): The y position of the report
+            c (int): The RGB565 color of the text
+        """
+        for line in self.report():
+            fb.text(line, x, y, c)
+            y += 10
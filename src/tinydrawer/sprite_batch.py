@@ -0,0 +1,193 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+from array import array
+
+FLIP_X = 1
+FLIP_Y = 2
+
+# one sprite is stored as n, x, y, w, h, flags, palette id, layer
+FIELDS = 8
+
+class SpriteBatch:
+    def __init__(self, td, capacity: int = 64):
+        """
+        Create a draw list that collects sprites during the frame and draws them together with flush().
+        Sprites are drawn by layer, and sprites fully covered by a later opaque sprite are skipped
+
+        Args:
+            td (TinyDrawer): The drawer that draws the sprites
+            capacity (int): The maximum number of sprites per frame
+        """
+        self.td = td
+        self.capacity = capacity
+        self.items = array("h", [0] * (capacity * FIELDS))
+        self.visible = bytearray(capacity)
+        self.count = 0
+        # palette id 0 keeps the pal() of the drawer
+        self.palettes = [None]
+        self.opaque = None
+        self.opaque_version = -1
+        self.drawn = 0
+        self.skipped = 0
+
+    def palette(self, mapping: dict) -> int:
+        """
+        Register a color mapping to use with spr(), like pal(c0, c1) for every pair in the mapping
+
+        Args:
+            mapping (dict): The {c0: c1} colors to replace
+
+        Returns:
+            int: The palette id
+        """
+        self.palettes.append(dict(mapping))
+        return len(self.palettes) - 1
+
+    def spr(self, n: int, x: int, y: int, w: int = 1, h: int = 1, flip_x: bool = False, flip_y: bool = False, layer: int = 0, palette: int = 0) -> bool:
+        """
+        Add the n sprite at x,y position to the batch. Sprites of the same layer are drawn in the order they are added
+
+        Args:
+            n (int): The sprite index starting at 0
+            x (int): The x position on the actual display, moved by the camera when drawing
+            y (int): The y position on the actual display, moved by the camera when drawing
+            w (int): Width of the sprite (1 = 8 pixels)
+            h (int): Height of the sprite (1 = 8 pixels)
+            flip_x (bool): True to flip the sprite horizontally when drawing
+            flip_y (bool): True to flip the sprite vertically when drawing
+            layer (int): Sprites of a higher layer are drawn on top
+            palette (int): The palette id from palette(), 0 to use the current pal()
+
+        Returns:
+            bool: True if the sprite is added, False if the batch is full
+        """
+        count = self.count
+        if count >= self.capacity:
+            return False
+        items = self.items
+        i = count * FIELDS
+        items[i] = n
+        items[i + 1] = x
+        items[i + 2] = y
+        items[i + 3] = w
+        items[i + 4] = h
+        items[i + 5] = (FLIP_X if flip_x else 0) | (FLIP_Y if flip_y else 0)
+        items[i + 6] = palette
+        items[i + 7] = layer
+        self.count = count + 1
+        return True
+
+    def clear(self):
+        """
+        Remove every sprite from the batch without drawing
+        """
+        self.count = 0
+
+    def update_opacity(self):
+        """
+        Find the 8 by 8 sprites without transparent pixels. Called by flush() when the sprite buffer changes
+        """
+        td = self.td
+        buffer_w = td.buffer_w
+        opaque = bytearray(buffer_w * td.buffer_h)
+        sget = td.sget
+        for k in range(len(opaque)):
+            sx = (k % buffer_w) * 8
+            sy = (k // buffer_w) * 8
+            solid = 1
+            for j in range(8):
+                for i in range(8):
+                    if sget(sx + i, sy + j) == 0:
+                        solid = 0
+                        break
+                if not solid:
+                    break
+            opaque[k] = solid
+        self.opaque = opaque
+        self.opaque_version = td.buffer_version
+
+    def flush(self, fb) -> int:
+        """
+        Draw every sprite in the batch on the frame buffer, then empty the batch
+
+        Args:
+            fb (framebuf.FrameBuffer): The frame buffer that stores actual display data
+
+        Returns:
+            int: The number of sprites drawn, occluded sprites are counted in skipped
+        """
+        count = self.count
+        self.count = 0
+        self.drawn = 0
+        self.skipped = 0
+        if count == 0:
+            return 0
+        td = self.td
+        if self.opaque_version != td.buffer_version:
+            self.update_opacity()
+        items = self.items
+        visible = self.visible
+        opaque = self.opaque
+        palettes = self.palettes
+        base_pal = td.pal_dict
+        buffer_w = td.buffer_w
+        size = 8 * td.zoom
+        # sorted() is stable, so sprites of the same layer keep their order
+        order = sorted(range(count), key=lambda k: items[k * FIELDS + 7])
+        # walk from the top sprite down, remembering the areas covered by opaque sprites
+        covers = []
+        for k in range(count - 1, -1, -1):
+            i = order[k] * FIELDS
+            x0 = items[i + 1]
+            y0 = items[i + 2]
+            w = items[i + 3]
+            h = items[i + 4]
+            x1 = x0 + w * size
+            y1 = y0 + h * size
+            covered = False
+            for c in covers:
+                if c[0] <= x0 and c[1] <= y0 and c[2] >= x1 and c[3] >= y1:
+                    covered = True
+                    break
+            visible[k] = not covered
+            if covered:
+                continue
+            mapping = palettes[items[i + 6]] or base_pal
+            solid = 0 in mapping
+            if not solid:
+                solid = True
+                n = items[i]
+                for j in range(h):
+                    for c in range(w):
+                        if not opaque[n + j * buffer_w + c]:
+                            solid = False
+                            break
+                    if not solid:
+                        break
+            if solid:
+                covers.append((x0, y0, x1, y1))
+        spr_clip = td.spr_clip
+        cam_x = td.cam_x
+        cam_y = td.cam_y
+        clip = td.clip_rect
+        current = 0
+        drawn = 0
+        for k in range(count):
+            if not visible[k]:
+                continue
+            i = order[k] * FIELDS
+            p = items[i + 6]
+            if p != current:
+                td.pal(palettes[p] if p else base_pal)
+                current = p
+            flags = items[i + 5]
+            spr_clip(fb, items[i], items[i + 1] - cam_x, items[i + 2] - cam_y, items[i + 3], items[i + 4], (flags & FLIP_X) != 0, (flags & FLIP_Y) != 0, clip)
+            drawn += 1
+        if current:
+            td.pal(base_pal)
+        self.drawn = drawn
+        self.skipped = count - drawn
+        return drawn
@@ -0,0 +1,74 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+from collections import OrderedDict
+
+class SpriteCache:
+    def __init__(self, max_bytes: int = 16384):
+        """
+        Create a least-recently-used cache of pre-rendered sprites.
+        Each entry is counted by the size of its pixel buffer in bytes
+
+        Args:
+            max_bytes (int): The byte budget of all cached entries together
+        """
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        """
+        Get a cached entry and mark it as the most recently used
+
+        Args:
+            key (tuple): The key of the entry
+
+        Returns:
+            object: The cached entry, or None if the key is not cached
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # move the entry to the most recently used end
+        del self.entries[key]
+        self.entries[key] = entry
+        return entry[0]
+
+    def put(self, key, value, size: int) -> bool:
+        """
+        Add an entry, evicting the least recently used entries until it fits the budget
+
+        Args:
+            key (tuple): The key of the entry
+            value (object): The entry to store
+            size (int): The size of the entry in bytes
+
+        Returns:
+            bool: True if the entry is stored, False if it is larger than the whole budget
+        """
+        if size > self.max_bytes:
+            return False
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.used_bytes -= old[1]
+        while self.used_bytes + size > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self.used_bytes -= self.entries.pop(oldest)[1]
+            self.evictions += 1
+        self.entries[key] = (value, size)
+        self.used_bytes += size
+        return True
+
+    def clear(self):
+        """
+        Remove every entry. The hit and miss counters are kept
+        """
+        self.entries = OrderedDict()
+        self.used_bytes = 0
@@ -0,0 +1,260 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+import framebuf
+from array import array
+
+SPR = 1
+RECT = 2
+MAP = 3
+PRINT = 4
+
+FLIP_X = 1
+FLIP_Y = 2
+
+# one draw is stored as op, top, bottom, then up to 6 arguments of the op
+FIELDS = 9
+
+class Strip(framebuf.FrameBuffer):
+    def __init__(self, width: int, rows: int):
+        """
+        A frame buffer of a few full rows of the display, with its pixels in buffer like LCD_1inch14
+
+        Args:
+            width (int): Width of the display
+            rows (int): The number of rows
+        """
+        self.width = width
+        self.height = rows
+        self.buffer = bytearray(width * rows * 2)
+        super().__init__(self.buffer, width, rows, framebuf.RGB565)
+
+class StripRenderer:
+    def __init__(self, td, lcd, rows: int = 16, capacity: int = 128):
+        """
+        Draw the frame into a buffer of a few rows at a time instead of a full frame buffer.
+        The draws of the frame are collected in a display list, then render() draws the list once for every strip
+        of rows and sends the strip before drawing the next one. Use it with LCD_1inch14(..., buffered = False)
+        to save the memory of the full frame buffer, 64 KB for the 240 x 135 display
+
+        Args:
+            td (TinyDrawer): The drawer that draws the sprites, the camera is applied when a draw is added,
+                the palette, zoom and clip area are the ones when render() is called
+            lcd (LCD_1inch14): The display, with scale = 1
+            rows (int): The number of rows in a strip, a strip uses width * rows * 2 bytes
+            capacity (int): The maximum number of draws per frame
+        """
+        self.td = td
+        self.lcd = lcd
+        self.rows = rows
+        self.capacity = capacity
+        self.strip = Strip(lcd.width, rows)
+        self.strip_mv = memoryview(self.strip.buffer)
+        self.ops = array("h", [0] * (capacity * FIELDS))
+        self.count = 0
+        # the tile maps and texts of the display list
+        self.refs = []
+        self.background = 0
+        self.strips = 0
+
+    def add(self, op: int, top: int, bottom: int, a: int = 0, b: int = 0, c: int = 0, d: int = 0, e: int = 0, f: int = 0) -> bool:
+        """
+        Add a draw to the display list
+
+        Args:
+            op (int): SPR, RECT, MAP or PRINT
+            top (int): The first row touched by the draw
+            bottom (int): The row after the last row touched by the draw
+            a, b, c, d, e, f (int): The arguments of the op
+
+        Returns:
+            bool: True if the draw is added, False if the display list is full
+        """
+        count = self.count
+        if count >= self.capacity:
+            return False
+        ops = self.ops
+        i = count * FIELDS
+        ops[i] = op
+        ops[i + 1] = top
+        ops[i + 2] = bottom
+        ops[i + 3] = a
+        ops[i + 4] = b
+        ops[i + 5] = c
+        ops[i + 6] = d
+        ops[i + 7] = e
+        ops[i + 8] = f
+        self.count = count + 1
+        return True
+
+    def cls(self, c: int = 0):
+        """
+        Empty the display list and fill the next frame with a color
+
+        Args:
+            c (int): The color index [0,15] of the background
+        """
+        self.count = 0
+        self.refs = []
+        self.background = c
+
+    def spr(self, n: int, x: int, y: int, w: int = 1, h: int = 1, flip_x: bool = False, flip_y: bool = False) -> bool:
+        """
+        Add the n sprite at x,y position, like TinyDrawer.spr()
+
+        Args:
+            n (int): The sprite index starting at 0
+            x (int): The x position on the actual display
+            y (int): The y position on the actual display
+            w (int): Width of the sprite (1 = 8 pixels)
+            h (int): Height of the sprite (1 = 8 pixels)
+            flip_x (bool): True to flip the sprite horizontally when drawing
+            flip_y (bool): True to flip the sprite vertically when drawing
+
+        Returns:
+            bool: True if the sprite is added, False if the display list is full
+        """
+        td = self.td
+        x -= td.cam_x
+        y -= td.cam_y
+        flags = (FLIP_X if flip_x else 0) | (FLIP_Y if flip_y else 0)
+        return self.add(SPR, y, y + h * 8 * td.zoom, n, x, y, w, h, flags)
+
+    def rectfill(self, x: int, y: int, w: int, h: int, c: int) -> bool:
+        """
+        Add a filled rectangle, moved by the camera
+
+        Args:
+            x (int): The x position on the actual display
+            y (int): The y position on the actual display
+            w (int): Width in pixels
+            h (int): Height in pixels
+            c (int): The color index [0,15], replaced by pal()
+
+        Returns:
+            bool: True if the rectangle is added, False if the display list is full
+        """
+        td = self.td
+        x -= td.cam_x
+        y -= td.cam_y
+        return self.add(RECT, y, y + h, x, y, w, h, c)
+
+    def map(self, tilemap, cam_x: int = 0, cam_y: int = 0, x: int = 0, y: int = 0, w: int = None, h: int = None) -> bool:
+        """
+        Add the tiles of the tile map seen by the camera in the x,y,w,h area, like TinyDrawer.map() without cached
+
+        Args:
+            tilemap (TileMap): The tile map to draw
+            cam_x (int): The x position of the camera in the tile map, in pixels of the display
+            cam_y (int): The y position of the camera in the tile map, in pixels of the display
+            x (int): The x position of the area on the actual display
+            y (int): The y position of the area on the actual display
+            w (int): Width of the area, or None to fill the rest of the display
+            h (int): Height of the area, or None to fill the rest of the display
+
+        Returns:
+            bool: True if the tile map is added, False if the display list is full
+        """
+        if w is None:
+            w = self.lcd.width - x
+        if h is None:
+            h = self.lcd.height - y
+        if not self.add(MAP, y, y + h, len(self.refs), x, y, w, h):
+            return False
+        self.refs.append((tilemap, cam_x, cam_y))
+        return True
+
+    def print(self, text: str, x: int, y: int, c: int = 7, zoom: int = None) -> bool:
+        """
+        Add text at x,y position, like TinyDrawer.print()
+
+        Args:
+            text (str): The text, "\\n" starts a new line
+            x (int): The x position on the actual display
+            y (int): The y position on the actual display
+            c (int): The color index [0,15], replaced by pal()
+            zoom (int): Scale of the pixels, the zoom of tiny_drawer by default
+
+        Returns:
+            bool: True if the text is added, False if the display list is full
+        """
+        td = self.td
+        if zoom is None:
+            zoom = td.zoom
+        text = str(text)
+        x -= td.cam_x
+        y -= td.cam_y
+        h = (text.count("\n") + 1) * 6 * zoom
+        if not self.add(PRINT, y, y + h, len(self.refs), x, y, c, zoom):
+            return False
+        self.refs.append(text)
+        return True
+
+    def render(self) -> int:
+        """
+        Draw the display list one strip at a time and send every strip to the display, then empty the list.
+        Each draw is only drawn in the strips it touches, clipped to the rows of the strip
+
+        Returns:
+            int: The number of strips sent
+        """
+        td = self.td
+        lcd = self.lcd
+        strip = self.strip
+        strip_mv = self.strip_mv
+        ops = self.ops
+        refs = self.refs
+        end = self.count * FIELDS
+        width, height, rows = lcd.width, lcd.height, self.rows
+        background = td.colors[td.pal_dict.get(self.background, self.background)]
+        colors = td.colors
+        pal_dict = td.pal_dict
+        spr_clip = td.spr_clip
+        cam_x, cam_y, clip_rect = td.cam_x, td.cam_y, td.clip_rect
+        cx0, cy0, cx1, cy1 = max(clip_rect[0], 0), max(clip_rect[1], 0), min(clip_rect[2], width), min(clip_rect[3], height)
+        strips = 0
+        try:
+            for y0 in range(0, height, rows):
+                h = min(rows, height - y0)
+                strip.fill_rect(0, 0, width, h, background)
+                # the clip area in the rows of the strip
+                clip = (cx0, max(cy0 - y0, 0), cx1, min(cy1 - y0, h))
+                # blit clips to the strip, but not to a smaller clip area
+                fb_clip = clip == (0, 0, width, h)
+                td.cam_x, td.cam_y, td.clip_rect = 0, y0, clip
+                y1 = y0 + h
+                for i in range(0, end, FIELDS):
+                    if ops[i + 1] >= y1 or ops[i + 2] <= y0:
+                        continue
+                    op = ops[i]
+                    if op == SPR:
+                        flags = ops[i + 8]
+                        spr_clip(strip, ops[i + 3], ops[i + 4], ops[i + 5] - y0, ops[i + 6], ops[i + 7], (flags & FLIP_X) != 0, (flags & FLIP_Y) != 0, clip, fb_clip)
+                    elif op == RECT:
+                        x = max(ops[i + 3], clip[0])
+                        y = max(ops[i + 4] - y0, clip[1])
+                        w = min(ops[i + 3] + ops[i + 5], clip[2]) - x
+                        rh = min(ops[i + 4] - y0 + ops[i + 6], clip[3]) - y
+                        if w > 0 and rh > 0:
+                            c = ops[i + 7]
+                            strip.fill_rect(x, y, w, rh, colors[pal_dict.get(c, c)])
+                    elif op == MAP:
+                        tilemap, map_x, map_y = refs[ops[i + 3]]
+                        x, y = ops[i + 4], ops[i + 5]
+                        # like TinyDrawer.map(), the area is clipped by the display but not by the clip area
+                        ax0, ay0 = max(x, 0), max(y - y0, 0)
+                        ax1, ay1 = min(x + ops[i + 6], width), min(y - y0 + ops[i + 7], h)
+                        if ax0 < ax1 and ay0 < ay1:
+                            td.map_area(strip, tilemap, map_x - x, map_y - y + y0, ax0, ay0, ax1, ay1)
+                    else:
+                        td.print(strip, refs[ops[i + 3]], ops[i + 4], ops[i + 5], ops[i + 6], ops[i + 7])
+                lcd.send_rows(strip_mv[:width * h * 2], y0, h)
+                strips += 1
+        finally:
+            td.cam_x, td.cam_y, td.clip_rect = cam_x, cam_y, clip_rect
+        self.strips = strips
+        self.count = 0
+        self.refs = []
+        return strips
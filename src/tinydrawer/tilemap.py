@@ -0,0 +1,99 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+import framebuf
+
+# the tile index of an empty cell
+EMPTY = 255
+
+class TileMap:
+    def __init__(self, w: int, h: int, tiles: bytes = None):
+        """
+        Create a tile map that stores one sprite index per cell, 1 byte each
+
+        Args:
+            w (int): A number of cells horizontally
+            h (int): A number of cells vertically
+            tiles (bytes): The sprite index of every cell row by row, or None for an empty map
+        """
+        self.w = w
+        self.h = h
+        if tiles is None:
+            self.tiles = bytearray(b"\xff" * (w * h))
+        else:
+            self.tiles = bytearray(tiles)
+        # increased on every change, so the pre-rendered view is drawn again
+        self.version = 0
+        self.view = None
+        self.view_w = 0
+        self.view_h = 0
+        self.view_x = 0
+        self.view_y = 0
+        self.view_state = None
+
+    @classmethod
+    def from_rows(cls, rows: list) -> "TileMap":
+        """
+        Create a tile map from a list of rows, where a negative index is an empty cell
+
+        Args:
+            rows (list): The rows of sprite indices
+
+        Returns:
+            TileMap: The tile map
+        """
+        w = len(rows[0])
+        tiles = bytearray(w * len(rows))
+        for y, row in enumerate(rows):
+            for x, n in enumerate(row):
+                tiles[y * w + x] = EMPTY if n < 0 else n
+        return cls(w, len(rows), tiles)
+
+    def mget(self, x: int, y: int) -> int:
+        """
+        Get the sprite index of the cell at x,y
+
+        Args:
+            x (int): The column of the cell
+            y (int): The row of the cell
+
+        Returns:
+            int: The sprite index, or EMPTY if the cell is empty or outside the map
+        """
+        if x < 0 or y < 0 or x >= self.w or y >= self.h:
+            return EMPTY
+        return self.tiles[y * self.w + x]
+
+    def mset(self, x: int, y: int, n: int):
+        """
+        Set the sprite index of the cell at x,y
+
+        Args:
+            x (int): The column of the cell
+            y (int): The row of the cell
+            n (int): The sprite index, or EMPTY to clear the cell
+        """
+        if x < 0 or y < 0 or x >= self.w or y >= self.h:
+            return
+        self.tiles[y * self.w + x] = n
+        self.version += 1
+
+    def set_view(self, w: int, h: int) -> framebuf.FrameBuffer:
+        """
+        Allocate the RGB565 buffer that keeps the pre-rendered view of the map
+
+        Args:
+            w (int): Width of the view in pixels
+            h (int): Height of the view in pixels
+
+        Returns:
+            framebuf.FrameBuffer: The view
+        """
+        self.view = None
+        self.view = framebuf.FrameBuffer(bytearray(w * h * 2), w, h, framebuf.RGB565)
+        self.view_w = w
+        self.view_h = h
+        self.view_state = None
+        return self.view
@@ -4,6 +4,16 @@
 # ----------------------------------------------------------------------------
 
 import framebuf
+from array import array
+from tinydrawer.sprite_cache import SpriteCache
+from tinydrawer.tilemap import TileMap, EMPTY
+from tinydrawer.bank import read_header, HEADER_SIZE
+from tinydrawer.font import glyph, GLYPH_W, GLYPH_H
+try:
+    from tinydrawer.kernel import spr_kernel, P_SIZE
+except (ImportError, SyntaxError, AttributeError):
+    # CPython, or MicroPython firmware without the viper code emitter
+    spr_kernel = None
 
 class TinyDrawer:
     def __init__(self, hex_string: str, buffer_w: int = 8, buffer_h: int = 4, display_w: int = 240, display_h: int = 135, zoom: int = 5):
@@ -12,19 +22,37 @@ class TinyDrawer:
         Default buffer is 8 columns by 4 rows where each sprite is 8 by 8 pixels
 
         Args:
-            hex_string (string): A string representation of the sprite buffer, length must be a multiple of 64
+            hex_string (string): A string representation of the sprite buffer, length must be a multiple of 64.
+                A module made by tools/compile_sprites.py can be passed instead, see set_compiled()
             buffer_w (int): A number of sprites the buffer can store horizontally
             buffer_h (int): A number of sprites the buffer can store vertically
             display_w (int): Width of the display in pixels
             display_h (int): Height of the display in pixels
             zoom (int): Scale of the pixels
         """
-        if not self.set_buffer_hex(hex_string, buffer_w, buffer_h):
+        self.cache = None
+        self.index_cache = None
+        self.spans = None
+        self.buffer_version = 0
+        self.compiled = None
+        # the camera and the drawn state of map_scroll(), and its band buffer
+        self.scroll_cam = None
+        self.scroll_state = None
+        self.scroll_band = None
+        # the display of set_indexed(), None while drawing RGB565 colors
+        self.screen = None
+        if isinstance(hex_string, str):
+            if not self.set_buffer_hex(hex_string, buffer_w, buffer_h):
+                return
+        elif not self.set_compiled(hex_string):
             return
         self.display_w = display_w
         self.display_h = display_h
         self.zoom = zoom
+        self.camera()
+        self.clip()
         self.pal_dict = {}
+        self.pal_key = ()
         self.colors = [
             # RGB333 [0-7] to RGB8 [0, 36, 73, 109, 146, 182, 219, 255]
             self.c333_565(0, 0, 0), # 0 black
@@ -44,8 +72,16 @@ class TinyDrawer:
             self.c333_565(7, 3, 5), # 14 pink
             self.c333_565(7, 6, 5), # 15 light-peach
         ]
+        self.color_key = self.free_color()
+        self.set_text_cache()
+        # the compiled kernel is used when it is available, set to None to draw with Python loops
+        self.kernel = spr_kernel
+        if spr_kernel is not None:
+            self.kernel_params = array("i", [0] * P_SIZE)
+            self.kernel_colors = array("H", [0] * 16)
+            self.kernel_pal_key = None
         
-    def set_buffer_hex(self, hex_string: str, buffer_w: int = 8, buffer_h: int = 4) -> bool:
+    def set_buffer_hex(self, hex_string: str, buffer_w: int = 8, buffer_h: int = 4, spans: bool = False, packed: bool = False) -> bool:
         """
         Set the sprite buffer using string containing hexadecimal numbers (1 character = 1-byte color)
         
@@ -53,22 +89,350 @@ class TinyDrawer:
             hex_string (string): A string representation of the buffer, length must be a multiple of 64
             buffer_w (int): A number of sprites the buffer can store horizontally
             buffer_h (int): A number of sprites the buffer can store vertically
+            spans (bool): True to compile the sprite rows into color spans, see compile_spans()
+            packed (bool): True to store 2 pixels per byte (4 bits per pixel), see set_buffer()
             
         Returns:
             bool: True if buffer is set successfully
         """
         hex_string = hex_string.replace("\n", "").strip().lower()
-        buffer = bytes(bytearray(int(char, 16) for char in hex_string))
-        if buffer_w < 0 or buffer_h < 0 or len(buffer) != 64 * buffer_w * buffer_h:
+        if packed:
+            if len(hex_string) % 2:
+                return False
+            # every hex digit is one pixel, so the bytes are already packed
+            buffer = bytearray(bytes.fromhex(hex_string))
+        else:
+            buffer = bytes(bytearray(int(char, 16) for char in hex_string))
+        return self.set_buffer(buffer, buffer_w, buffer_h, spans, packed)
+
+    def set_buffer(self, buffer, buffer_w: int = 8, buffer_h: int = 4, spans: bool = False, packed: bool = False) -> bool:
+        """
+        Set the sprite buffer using the color index of each pixel, row by row across the whole buffer.
+        A packed buffer stores 2 pixels per byte with the left pixel in the high 4 bits,
+        the same layout as framebuf.GS4_HMSB
+
+        Args:
+            buffer (bytes): The pixels, 64 * buffer_w * buffer_h bytes or half of it when packed
+            buffer_w (int): A number of sprites the buffer can store horizontally
+            buffer_h (int): A number of sprites the buffer can store vertically
+            spans (bool): True to compile the sprite rows into color spans, see compile_spans()
+            packed (bool): True if the buffer stores 2 pixels per byte
+
+        Returns:
+            bool: True if buffer is set successfully
+        """
+        size = 64 * buffer_w * buffer_h
+        if packed:
+            size //= 2
+        if buffer_w < 0 or buffer_h < 0 or len(buffer) != size:
             return False
         self.buffer_w = buffer_w
         self.buffer_h = buffer_h
         self.buffer = buffer
+        self.packed = packed
+        # lets other objects notice that the sprites changed, even when load_bank() reuses the buffer
+        self.buffer_version += 1
+        self.compiled = None
+        if self.cache is not None:
+            self.cache.clear()
+        if self.index_cache is not None:
+            self.index_cache.clear()
+        if spans:
+            self.compile_spans()
+        else:
+            self.spans = None
+        return True
+
+    def set_compiled(self, module) -> bool:
+        """
+        Use the sprites of a module made by tools/compile_sprites.py. The module has the packed sprite buffer
+        and every sprite pre-rendered to RGB565 at some zoom levels, so spr() draws them with a single blit.
+        When the module is frozen into the firmware, the sprites are read from flash without using memory.
+        Sprites at other zoom levels, or drawn after pal(), use the packed sprite buffer
+
+        Args:
+            module (module): The compiled sprites
+
+        Returns:
+            bool: True if the sprites are set successfully
+        """
+        if not self.set_buffer(module.SHEET, module.BUFFER_W, module.BUFFER_H, False, True):
+            return False
+        self.compiled = module
         return True
+
+    def load_bank(self, path: str, spans: bool = False) -> bool:
+        """
+        Set the sprite buffer from a sprite bank file, see tools/hex2bank.py.
+        The pixels are read directly into the current sprite buffer when it has the same size,
+        so switching between banks of the same size doesn't allocate memory.
+        The length of the file is checked first, so the current sprites are kept when the file is invalid or truncated
+
+        Args:
+            path (str): The path of the sprite bank file
+            spans (bool): True to compile the sprite rows into color spans, see compile_spans()
+
+        Returns:
+            bool: True if buffer is set successfully
+        """
+        with open(path, "rb") as f:
+            header = read_header(f)
+            if header is None:
+                return False
+            buffer_w, buffer_h, packed, size = header
+            if f.seek(0, 2) - HEADER_SIZE < size:
+                return False
+            f.seek(HEADER_SIZE)
+            buffer = self.buffer
+            if not isinstance(buffer, bytearray) or len(buffer) != size:
+                # release the old buffer before allocating the new one
+                self.buffer = buffer = None
+                buffer = bytearray(size)
+            if f.readinto(buffer) != size:
+                return False
+        return self.set_buffer(buffer, buffer_w, buffer_h, spans, packed)
+
+    def sget(self, x: int, y: int) -> int:
+        """
+        Get the color index of a pixel in the sprite buffer
+
+        Args:
+            x (int): The x position in the sprite buffer, 8 pixels per sprite
+            y (int): The y position in the sprite buffer, 8 pixels per sprite
+
+        Returns:
+            int: The color index [0-15]
+        """
+        i = y * self.buffer_w * 8 + x
+        if self.packed:
+            if i & 1:
+                return self.buffer[i >> 1] & 15
+            return self.buffer[i >> 1] >> 4
+        return self.buffer[i]
+
+    def compile_spans(self):
+        """
+        Compile every 8-pixel row of every sprite into spans of (start, length, color) where
+        transparent pixels are dropped. spr() then draws one rectangle per span instead of one per pixel
+        """
+        row_w = self.buffer_w * 8
+        spans = array("B")
+        # span_index[k] to span_index[k + 1] are the spans of the k-th sprite row, 3 bytes per span
+        span_index = array("I", [0])
+        row = bytearray(8)
+        for i in range(0, row_w * self.buffer_h * 8, 8):
+            for j in range(8):
+                row[j] = self.sget((i + j) % row_w, (i + j) // row_w)
+            start = 0
+            while start < 8:
+                c = row[start]
+                end = start + 1
+                while end < 8 and row[end] == c:
+                    end += 1
+                if c != 0:
+                    spans.append(start)
+                    spans.append(end - start)
+                    spans.append(c)
+                start = end
+            span_index.append(len(spans))
+        # 2 bytes per index are enough unless the sprite buffer is very large
+        if len(spans) < 65536:
+            span_index = array("H", span_index)
+            self.span_index_bytes = 2 * len(span_index)
+        else:
+            self.span_index_bytes = 4 * len(span_index)
+        self.spans = spans
+        self.span_index = span_index
+
+    def mem_info(self, verbose: bool = True) -> int:
+        """
+        Report the memory used by the sprite buffer, the spans and the sprite caches
+
+        Args:
+            verbose (bool): True to print the memory used by each part
+
+        Returns:
+            int: The total number of bytes
+        """
+        sheet = len(self.buffer)
+        spans = 0 if self.spans is None else len(self.spans) + self.span_index_bytes
+        cache = 0 if self.cache is None else self.cache.used_bytes
+        index_cache = 0 if self.index_cache is None else self.index_cache.used_bytes
+        text = 0 if self.text_cache is None else self.text_cache.used_bytes
+        if verbose:
+            print("sprite buffer: {} x {} sprites, {} bytes{}".format(self.buffer_w, self.buffer_h, sheet, " (packed)" if self.packed else ""))
+            print("spans: {} bytes".format(spans))
+            if self.cache is not None:
+                print("sprite cache: {} of {} bytes".format(cache, self.cache.max_bytes))
+            if self.index_cache is not None:
+                print("palette blit cache: {} of {} bytes".format(index_cache, self.index_cache.max_bytes))
+            if self.text_cache is not None:
+                print("text cache: {} of {} bytes".format(text, self.text_cache.max_bytes))
+        return sheet + spans + cache + index_cache + text
+
+    def set_cache(self, max_bytes: int = 16384):
+        """
+        Pre-render every sprite variant drawn by spr() once, then draw it with a single blit.
+        A variant is a sprite index, size, flips, palette replacement and zoom level.
+        The least recently used variants are removed when the cache exceeds max_bytes
+
+        Args:
+            max_bytes (int): The memory budget of the cache in bytes, 0 to disable the cache
+        """
+        if max_bytes > 0:
+            self.cache = SpriteCache(max_bytes)
+            self.color_key = self.free_color()
+        else:
+            self.cache = None
     
+    def set_text_cache(self, max_bytes: int = 2048):
+        """
+        Pre-render every text drawn by print() once with 1 bit per pixel, then draw it with a single blit.
+        A text is cached for each color and zoom level.
+        The least recently used texts are removed when the cache exceeds max_bytes
+
+        Args:
+            max_bytes (int): The memory budget of the cache in bytes, 0 to disable the cache
+        """
+        self.text_cache = SpriteCache(max_bytes) if max_bytes > 0 else None
+    
+    def set_indexed(self, lcd = None):
+        """
+        Draw palette indices instead of RGB565 colors, for a display created with LCD_1inch14(indexed = True).
+        The colors are written to the palette of the display, then colors becomes the indices 0 to 15.
+        Sprites are pre-rendered with 1 byte per pixel, and the compiled sprites and the compiled kernel
+        aren't used since they write RGB565 pixels
+
+        Args:
+            lcd (LCD_1inch14): The display with indexed = True, or None to draw RGB565 colors again
+        """
+        if lcd is not None:
+            if self.screen is None:
+                self.rgb_colors = self.colors
+            self.colors = list(range(16))
+            lcd.set_palette(self.rgb_colors)
+            self.kernel = None
+        elif self.screen is not None:
+            self.colors = self.rgb_colors
+            self.kernel = spr_kernel
+        self.screen = lcd
+        # the pre-rendered sprites and texts have the colors of the other mode
+        self.color_key = self.free_color()
+        if self.cache is not None:
+            self.cache.clear()
+        if self.text_cache is not None:
+            self.text_cache.clear()
+        if self.index_cache is not None:
+            self.update_palette()
+
+    def screen_pal(self, c0: int = None, c1: int = None):
+        """
+        Show the color c0 as c1 on the display of set_indexed(), without drawing the frame again,
+        like pal(c0, c1, 1) in PICO-8. Call screen_pal() to reset, and lcd.set_color() for any other RGB565 color
+
+        Args:
+            c0 (int): The color index drawn in the frame
+            c1 (int): The color index to show instead
+        """
+        screen = self.screen
+        if screen is None:
+            return
+        if c0 is None or c1 is None:
+            screen.set_palette(self.rgb_colors)
+        else:
+            screen.set_color(c0, self.rgb_colors[c1])
+
+    def set_palette_blit(self, max_bytes: int = 16384):
+        """
+        Draw sprites with framebuf's blit through a palette of 16 RGB565 colors, so the drawing runs in C.
+        pal() only changes the palette, so replacing colors doesn't slow down drawing.
+        Sprites at zoom 1 are drawn directly from the sprite buffer, which is packed if it isn't.
+        Zoomed and flipped sprites are pre-rendered once with 4 bits per pixel, up to max_bytes
+
+        Args:
+            max_bytes (int): The memory budget of the pre-rendered sprites in bytes, 0 to turn off palette blits
+        """
+        if max_bytes <= 0:
+            self.index_cache = None
+            return
+        if not self.packed:
+            self.pack()
+        self.index_cache = SpriteCache(max_bytes)
+        self.palette = framebuf.FrameBuffer(bytearray(32), 16, 1, framebuf.RGB565)
+        self.update_palette()
+
+    def pack(self):
+        """
+        Convert the sprite buffer to 2 pixels per byte, see set_buffer()
+        """
+        if self.packed:
+            return
+        buffer = self.buffer
+        packed = bytearray(len(buffer) // 2)
+        for i in range(len(packed)):
+            packed[i] = buffer[2 * i] << 4 | buffer[2 * i + 1]
+        self.set_buffer(packed, self.buffer_w, self.buffer_h, self.spans is not None, True)
+
+    def update_palette(self):
+        """
+        Write the colors of the palette blits, after replacing colors with pal().
+        Color 0 is the transparent color key unless it is replaced
+        """
+        for c in range(16):
+            if c in self.pal_dict:
+                self.palette.pixel(c, 0, self.colors[self.pal_dict[c]])
+            elif c == 0:
+                self.palette.pixel(c, 0, self.color_key)
+            else:
+                self.palette.pixel(c, 0, self.colors[c])
+
+    def index_sprite(self, n: int, w: int, h: int, flip_x: bool, flip_y: bool) -> framebuf.FrameBuffer:
+        """
+        Get the 4-bit frame buffer of the n sprite at the current zoom for palette blits
+
+        Args:
+            n (int): The sprite index starting at 0
+            w (int): Width of the sprite (1 = 8 pixels)
+            h (int): Height of the sprite (1 = 8 pixels)
+            flip_x (bool): True to flip the sprite horizontally
+            flip_y (bool): True to flip the sprite vertically
+
+        Returns:
+            framebuf.FrameBuffer: The sprite, or None if it is larger than the memory budget
+        """
+        cache = self.index_cache
+        zoom = self.zoom
+        key = (n, w, h, flip_x, flip_y, zoom)
+        sprite = cache.get(key)
+        if sprite is not None:
+            return sprite
+        w8, h8 = w * 8, h * 8
+        row_w = self.buffer_w * 8
+        bx0 = (n % self.buffer_w) * 8
+        by0 = (n // self.buffer_w) * 8
+        if zoom == 1 and not flip_x and not flip_y and self.packed and isinstance(self.buffer, bytearray):
+            # a view into the packed sprite buffer, nothing is copied. A frame buffer needs a writable buffer,
+            # so an unpacked sprite buffer or the read-only SHEET of compiled sprites is copied below instead
+            start = (by0 * row_w + bx0) // 2
+            sprite = framebuf.FrameBuffer(memoryview(self.buffer)[start:], w8, h8, framebuf.GS4_HMSB, row_w)
+            cache.put(key, sprite, 0)
+            return sprite
+        size = w8 * h8 * zoom * zoom // 2
+        if size > cache.max_bytes:
+            return None
+        sprite = framebuf.FrameBuffer(bytearray(size), w8 * zoom, h8 * zoom, framebuf.GS4_HMSB)
+        for by in range(h8):
+            dy = (h8 - 1 - by if flip_y else by) * zoom
+            for bx in range(w8):
+                c = self.sget(bx0 + bx, by0 + by)
+                if c != 0:
+                    sprite.fill_rect((w8 - 1 - bx if flip_x else bx) * zoom, dy, zoom, zoom, c)
+        cache.put(key, sprite, size)
+        return sprite
+
     def spr(self, fb: framebuf.FrameBuffer, n: int, x: int, y: int, w: int = 1, h: int = 1, flip_x: bool = False, flip_y: bool = False): 
         """
-        Draw the n sprite at x,y position
+        Draw the n sprite at x,y position, moved by the camera and clipped by the clip area
         
         Args:
             fb (framebuf.FrameBuffer): The frame buffer that stores actual display data
@@ -80,49 +444,597 @@ class TinyDrawer:
             flip_x (bool): True to flip the sprite horizontally when drawing
             flip_y (bool): True to flip the sprite vertically when drawing
         """
+        self.spr_clip(fb, n, x - self.cam_x, y - self.cam_y, w, h, flip_x, flip_y, self.clip_rect)
+
+    def spr_clip(self, fb: framebuf.FrameBuffer, n: int, x: int, y: int, w: int, h: int, flip_x: bool, flip_y: bool, clip: tuple, fb_clip: bool = False):
+        """
+        Draw the n sprite at x,y position on the frame buffer, ignoring the camera.
+        Sprites outside the clip area are skipped, and only the visible part of the other sprites is drawn
+
+        Args:
+            fb (framebuf.FrameBuffer): The frame buffer that stores actual display data
+            n (int): The sprite index starting at 0
+            x (int): The x position on the frame buffer
+            y (int): The x position on the frame buffer
+            w (int): Width of the sprite (1 = 8 pixels)
+            h (int): Height of the sprite (1 = 8 pixels)
+            flip_x (bool): True to flip the sprite horizontally when drawing
+            flip_y (bool): True to flip the sprite vertically when drawing
+            clip (tuple): The (x0, y0, x1, y1) clip area, x1 and y1 are excluded
+            fb_clip (bool): True when the clip area is the whole frame buffer, such as a strip of StripRenderer,
+                so partly visible sprites can still be blitted and clipped by blit itself
+        """
+        x1, y1 = x + w * 8 * self.zoom, y + h * 8 * self.zoom
+        if x >= clip[2] or y >= clip[3] or x1 <= clip[0] or y1 <= clip[1]:
+            return
+        mark_dirty = getattr(fb, "mark_dirty", None)
+        if mark_dirty is not None:
+            # only the visible part changes
+            dx0, dy0 = max(x, clip[0]), max(y, clip[1])
+            mark_dirty(dx0, dy0, min(x1, clip[2]) - dx0, min(y1, clip[3]) - dy0)
+        if not fb_clip and (x < clip[0] or y < clip[1] or x1 > clip[2] or y1 > clip[3]):
+            # blit can't clip, so partly visible sprites only draw their visible pixels
+            self.draw(fb, n, x, y, w, h, flip_x, flip_y, clip)
+            return
+        if self.compiled is not None and not self.pal_dict:
+            if self.blit_compiled(fb, n, x, y, w, h, flip_x, flip_y):
+                return
+        if self.index_cache is not None:
+            sprite = self.index_sprite(n, w, h, flip_x, flip_y)
+            if sprite is not None:
+                fb.blit(sprite, x, y, self.color_key, self.palette)
+                return
+        cache = self.cache
+        if cache is not None:
+            key = (n, w, h, flip_x, flip_y, self.zoom, self.pal_key)
+            sprite = cache.get(key)
+            if sprite is None:
+                size = w * h * 128 * self.zoom * self.zoom
+                if self.screen is not None:
+                    size //= 2
+                if size <= cache.max_bytes:
+                    sprite = self.render(n, w, h, flip_x, flip_y)
+                    cache.put(key, sprite, size)
+            if sprite is not None:
+                fb.blit(sprite, x, y, self.color_key)
+                return
+        self.draw(fb, n, x, y, w, h, flip_x, flip_y, clip)
+
+    def blit_compiled(self, fb: framebuf.FrameBuffer, n: int, x: int, y: int, w: int, h: int, flip_x: bool, flip_y: bool) -> bool:
+        """
+        Draw the n sprite with the pre-rendered sprites of set_compiled()
+
+        Args:
+            fb (framebuf.FrameBuffer): The frame buffer that stores actual display data
+            n (int): The sprite index starting at 0
+            x (int): The x position on the frame buffer
+            y (int): The y position on the frame buffer
+            w (int): Width of the sprite (1 = 8 pixels)
+            h (int): Height of the sprite (1 = 8 pixels)
+            flip_x (bool): True to flip the sprite horizontally when drawing
+            flip_y (bool): True to flip the sprite vertically when drawing
+
+        Returns:
+            bool: True if the sprite is drawn, False if it isn't compiled for the zoom level and flips
+        """
+        if self.screen is not None:
+            return False
+        compiled = self.compiled
+        zooms = compiled.ZOOMS
+        zoom = self.zoom
+        if zoom not in zooms:
+            return False
+        flips = (1 if flip_x else 0) | (2 if flip_y else 0)
+        if flips >= compiled.FLIPS:
+            return False
+        last = n + (h - 1) * self.buffer_w + w - 1
+        if last >= compiled.COUNT:
+            return False
+        sprites = compiled.SPRITES
+        base = (zooms.index(zoom) * compiled.FLIPS + flips) * compiled.COUNT + n
+        key = compiled.KEY
+        size = 8 * zoom
+        if w == 1 and h == 1:
+            data = sprites[base]
+            if data is None:
+                return False
+            if data:
+                fb.blit((data, size, size, framebuf.RGB565), x, y, key)
+            return True
+        cells = [sprites[base + j * self.buffer_w + i] for j in range(h) for i in range(w)]
+        if None in cells:
+            return False
+        for j in range(h):
+            dy = y + (h - 1 - j if flip_y else j) * size
+            for i in range(w):
+                data = cells[j * w + i]
+                if data:
+                    fb.blit((data, size, size, framebuf.RGB565), x + (w - 1 - i if flip_x else i) * size, dy, key)
+        return True
+
+    def camera(self, x: int = 0, y: int = 0):
+        """
+        Move the camera, spr() draws every sprite moved by -x,-y. Call camera() to reset
+
+        Args:
+            x (int): The x position of the camera
+            y (int): The y position of the camera
+        """
+        self.cam_x = x
+        self.cam_y = y
+
+    def clip(self, x: int = None, y: int = None, w: int = None, h: int = None):
+        """
+        Only draw sprites inside the x,y,w,h area of the display. Call clip() to reset to the entire display
+
+        Args:
+            x (int): The x position of the clip area
+            y (int): The y position of the clip area
+            w (int): Width of the clip area
+            h (int): Height of the clip area
+        """
+        if x is None:
+            self.clip_rect = (0, 0, self.display_w, self.display_h)
+        else:
+            self.clip_rect = (x, y, x + w, y + h)
+
+    def render(self, n: int, w: int = 1, h: int = 1, flip_x: bool = False, flip_y: bool = False) -> framebuf.FrameBuffer:
+        """
+        Draw the n sprite to a new RGB565 frame buffer at the current zoom and palette, or GS8 with set_indexed().
+        Transparent pixels are filled with the color key
+
+        Args:
+            n (int): The sprite index starting at 0
+            w (int): Width of the sprite (1 = 8 pixels)
+            h (int): Height of the sprite (1 = 8 pixels)
+            flip_x (bool): True to flip the sprite horizontally when drawing
+            flip_y (bool): True to flip the sprite vertically when drawing
+
+        Returns:
+            framebuf.FrameBuffer: The rendered sprite
+        """
+        pw, ph = w * 8 * self.zoom, h * 8 * self.zoom
+        if self.screen is not None:
+            # a palette index or the color key fits in 1 byte
+            sprite = framebuf.FrameBuffer(bytearray(pw * ph), pw, ph, framebuf.GS8)
+            sprite.fill(self.color_key)
+            self.draw(sprite, n, 0, 0, w, h, flip_x, flip_y)
+            return sprite
+        buffer = bytearray(pw * ph * 2)
+        sprite = framebuf.FrameBuffer(buffer, pw, ph, framebuf.RGB565)
+        sprite.fill(self.color_key)
+        if self.kernel is not None:
+            self.draw_kernel(buffer, pw, ph, n, 0, 0, w, h, flip_x, flip_y)
+        else:
+            self.draw(sprite, n, 0, 0, w, h, flip_x, flip_y)
+        return sprite
+
+    def draw(self, fb: framebuf.FrameBuffer, n: int, x: int, y: int, w: int = 1, h: int = 1, flip_x: bool = False, flip_y: bool = False, clip: tuple = None):
+        """
+        Draw the n sprite at x,y position pixel by pixel, without using the cache
+
+        Args:
+            fb (framebuf.FrameBuffer): The frame buffer that stores actual display data
+            n (int): The sprite index starting at 0
+            x (int): The x position on the actual display
+            y (int): The x position on the actual display
+            w (int): Width of the sprite (1 = 8 pixels)
+            h (int): Height of the sprite (1 = 8 pixels)
+            flip_x (bool): True to flip the sprite horizontally when drawing
+            flip_y (bool): True to flip the sprite vertically when drawing
+            clip (tuple): The (x0, y0, x1, y1) area to draw in, x1 and y1 are excluded, or None to draw the entire sprite
+        """
+        zoom = self.zoom
         w8, h8 = w * 8, h * 8
+        if clip is None:
+            clip = (x, y, x + w8 * zoom, y + h8 * zoom)
+        if self.kernel is not None:
+            # frame buffers with their RGB565 pixels in fb.buffer, such as LCD_1inch14
+            buffer = getattr(fb, "buffer", None)
+            if buffer is not None and len(buffer) == fb.width * fb.height * 2:
+                self.draw_kernel(buffer, fb.width, fb.height, n, x, y, w, h, flip_x, flip_y, clip)
+                return
+        # the spans skip color 0, so they can't be used while color 0 is replaced
+        if self.spans is not None and 0 not in self.pal_dict:
+            self.draw_spans(fb, n, x, y, w, h, flip_x, flip_y, clip)
+            return
+        cx0, cy0, cx1, cy1 = clip
+        row_w = self.buffer_w * 8
         bx0 = (n % self.buffer_w) * 8
-        bx1 = bx0 + w8
-        if n == 0:
-            by0, by1 = 0, h8
+        by0 = (n // self.buffer_w) * 8
+        buffer = self.buffer
+        packed = self.packed
+        pal_dict = self.pal_dict
+        colors = self.colors
+        # only the columns and rows of the sprite inside the clip area, in the order they are drawn
+        for j in range(max(0, (cy0 - y) // zoom), min(h8, (cy1 - y + zoom - 1) // zoom)):
+            dy = y + j * zoom
+            dh = zoom
+            if dy < cy0:
+                dh -= cy0 - dy
+                dy = cy0
+            if dy + dh > cy1:
+                dh = cy1 - dy
+            if flip_y:
+                row = (by0 + h8 - 1 - j) * row_w + bx0
+            else:
+                row = (by0 + j) * row_w + bx0
+            for i in range(max(0, (cx0 - x) // zoom), min(w8, (cx1 - x + zoom - 1) // zoom)):
+                if flip_x:
+                    k = row + w8 - 1 - i
+                else:
+                    k = row + i
+                if packed:
+                    c = buffer[k >> 1] & 15 if k & 1 else buffer[k >> 1] >> 4
+                else:
+                    c = buffer[k]
+                c_pal = c in pal_dict
+                if c_pal or c != 0:
+                    if c_pal:
+                        c = pal_dict[c]
+                    dx = x + i * zoom
+                    dw = zoom
+                    if dx < cx0:
+                        dw -= cx0 - dx
+                        dx = cx0
+                    if dx + dw > cx1:
+                        dw = cx1 - dx
+                    fb.fill_rect(dx, dy, dw, dh, colors[c])
+
+    def draw_kernel(self, buffer: bytearray, buffer_w: int, buffer_h: int, n: int, x: int, y: int, w: int = 1, h: int = 1, flip_x: bool = False, flip_y: bool = False, clip: tuple = None):
+        """
+        Draw the n sprite at x,y position with the compiled kernel, writing RGB565 pixels into the buffer
+
+        Args:
+            buffer (bytearray): The RGB565 pixels to draw on
+            buffer_w (int): Width of the buffer in pixels
+            buffer_h (int): Height of the buffer in pixels
+            n (int): The sprite index starting at 0
+            x (int): The x position on the buffer
+            y (int): The y position on the buffer
+            w (int): Width of the sprite (1 = 8 pixels)
+            h (int): Height of the sprite (1 = 8 pixels)
+            flip_x (bool): True to flip the sprite horizontally when drawing
+            flip_y (bool): True to flip the sprite vertically when drawing
+            clip (tuple): The (x0, y0, x1, y1) area to draw in, x1 and y1 are excluded, or None for the entire buffer
+        """
+        colors = self.kernel_colors
+        if self.kernel_pal_key != self.pal_key:
+            # the drawn colors after replacing colors, color 0 is transparent unless it is replaced
+            drawn = 0
+            for c in range(16):
+                if c in self.pal_dict:
+                    colors[c] = self.colors[self.pal_dict[c]]
+                    drawn |= 1 << c
+                elif c != 0:
+                    colors[c] = self.colors[c]
+                    drawn |= 1 << c
+            self.kernel_drawn = drawn
+            self.kernel_pal_key = self.pal_key
+        row_w = self.buffer_w * 8
+        p = self.kernel_params
+        p[0] = buffer_w
+        if clip is None:
+            p[1], p[2], p[3], p[4] = 0, 0, buffer_w, buffer_h
         else:
-            by0 = (n // self.buffer_w) * 8
-            by1 = by0 + h8
-        if flip_x:
-            h_add = -self.zoom
-            x += w8 * self.zoom
+            # the kernel must never write outside the buffer
+            p[1], p[2] = max(clip[0], 0), max(clip[1], 0)
+            p[3], p[4] = min(clip[2], buffer_w), min(clip[3], buffer_h)
+        p[5] = x
+        p[6] = y
+        p[7] = w * 8
+        p[8] = h * 8
+        p[9] = self.zoom
+        p[10] = 1 if flip_x else 0
+        p[11] = 1 if flip_y else 0
+        p[12] = (n // self.buffer_w) * 8 * row_w + (n % self.buffer_w) * 8
+        p[13] = row_w
+        p[14] = 1 if self.packed else 0
+        p[15] = self.kernel_drawn
+        self.kernel(buffer, self.buffer, p, colors)
+
+    def draw_spans(self, fb: framebuf.FrameBuffer, n: int, x: int, y: int, w: int = 1, h: int = 1, flip_x: bool = False, flip_y: bool = False, clip: tuple = None):
+        """
+        Draw the n sprite at x,y position span by span, requires compile_spans()
+
+        Args:
+            fb (framebuf.FrameBuffer): The frame buffer that stores actual display data
+            n (int): The sprite index starting at 0
+            x (int): The x position on the actual display
+            y (int): The x position on the actual display
+            w (int): Width of the sprite (1 = 8 pixels)
+            h (int): Height of the sprite (1 = 8 pixels)
+            flip_x (bool): True to flip the sprite horizontally when drawing
+            flip_y (bool): True to flip the sprite vertically when drawing
+        """
+        zoom = self.zoom
+        spans = self.spans
+        span_index = self.span_index
+        pal_dict = self.pal_dict
+        colors = self.colors
+        buffer_w = self.buffer_w
+        w8, h8 = w * 8, h * 8
+        if clip is None:
+            clip = (x, y, x + w8 * zoom, y + h8 * zoom)
+        cx0, cy0, cx1, cy1 = clip
+        # k0 is the index of the first sprite row, a sprite row is 8 pixels of one sprite
+        k0 = (n // buffer_w) * 8 * buffer_w + n % buffer_w
+        for j in range(max(0, (cy0 - y) // zoom), min(h8, (cy1 - y + zoom - 1) // zoom)):
+            dy = y + j * zoom
+            dh = zoom
+            if dy < cy0:
+                dh -= cy0 - dy
+                dy = cy0
+            if dy + dh > cy1:
+                dh = cy1 - dy
+            k = k0 + (h8 - 1 - j if flip_y else j) * buffer_w
+            for cell in range(w):
+                for i in range(span_index[k + cell], span_index[k + cell + 1], 3):
+                    start = cell * 8 + spans[i]
+                    length = spans[i + 1]
+                    if flip_x:
+                        start = w8 - start - length
+                    dx0 = x + start * zoom
+                    dx1 = dx0 + length * zoom
+                    if dx0 < cx0:
+                        dx0 = cx0
+                    if dx1 > cx1:
+                        dx1 = cx1
+                    if dx0 < dx1:
+                        c = spans[i + 2]
+                        if c in pal_dict:
+                            c = pal_dict[c]
+                        fb.fill_rect(dx0, dy, dx1 - dx0, dh, colors[c])
+
+    def map(self, fb: framebuf.FrameBuffer, tilemap: TileMap, cam_x: int = 0, cam_y: int = 0, x: int = 0, y: int = 0, w: int = None, h: int = None, cached: bool = False):
+        """
+        Draw the tiles of the tile map seen by the camera into the x,y,w,h area of the display.
+        Only the tiles inside the area are drawn, and tiles on the edges are clipped by the area
+
+        Args:
+            fb (framebuf.FrameBuffer): The frame buffer that stores actual display data
+            tilemap (TileMap): The tile map to draw
+            cam_x (int): The x position of the camera in the tile map, in pixels of the display
+            cam_y (int): The y position of the camera in the tile map, in pixels of the display
+            x (int): The x position of the area on the actual display
+            y (int): The y position of the area on the actual display
+            w (int): Width of the area, or None to fill the rest of the display
+            h (int): Height of the area, or None to fill the rest of the display
+            cached (bool): True to keep the area pre-rendered in a w by h buffer, drawn again only
+                for the tiles scrolled into view or when the tile map, palette or zoom changed
+        """
+        if w is None:
+            w = self.display_w - x
+        if h is None:
+            h = self.display_h - y
+        if not cached:
+            self.map_area(fb, tilemap, cam_x - x, cam_y - y, x, y, x + w, y + h)
+            return
+        view = tilemap.view
+        if view is None or tilemap.view_w != w or tilemap.view_h != h:
+            view = tilemap.set_view(w, h)
+        state = (self.zoom, self.pal_key, tilemap.version, self.buffer_version, self.screen is None)
+        dx, dy = cam_x - tilemap.view_x, cam_y - tilemap.view_y
+        if tilemap.view_state != state or abs(dx) >= w or abs(dy) >= h:
+            view.fill(self.color_key)
+            self.map_area(view, tilemap, cam_x, cam_y, 0, 0, w, h)
+        elif dx or dy:
+            # move the pre-rendered tiles, then draw the exposed columns and rows
+            view.scroll(-dx, -dy)
+            if dx:
+                x0 = w - dx if dx > 0 else 0
+                view.fill_rect(x0, 0, abs(dx), h, self.color_key)
+                self.map_area(view, tilemap, cam_x, cam_y, x0, 0, x0 + abs(dx), h)
+            if dy:
+                y0 = h - dy if dy > 0 else 0
+                view.fill_rect(0, y0, w, abs(dy), self.color_key)
+                self.map_area(view, tilemap, cam_x, cam_y, 0, y0, w, y0 + abs(dy))
+        tilemap.view_x, tilemap.view_y = cam_x, cam_y
+        tilemap.view_state = state
+        mark_dirty = getattr(fb, "mark_dirty", None)
+        if mark_dirty is not None:
+            mark_dirty(x, y, w, h)
+        fb.blit(view, x, y, self.color_key)
+
+    def map_scroll(self, lcd, tilemap: TileMap, cam_x: int = 0, cam_y: int = 0, c: int = 0) -> int:
+        """
+        Draw a tile map that fills the display directly into the memory of LCD_1inch14 with hardware scrolling.
+        Only the tiles scrolled into view are drawn, into a band of one tile, and sent to the columns
+        or rows of the display memory they wrap around to. The whole map is sent on the first call, after
+        a jump of a full screen, or when the tile map, palette, zoom or the other camera axis changed.
+        The camera moves along scroll_axis() of the display, x in landscape and y in portrait
+
+        Args:
+            lcd (LCD_1inch14): The display with scale = 1, its scrolling area is set to the full display on the first call
+            tilemap (TileMap): The tile map to draw
+            cam_x (int): The x position of the camera in the tile map, in pixels of the display
+            cam_y (int): The y position of the camera in the tile map, in pixels of the display
+            c (int): The color index [0,15] of the empty cells
+
+        Returns:
+            int: The number of columns or rows sent
+        """
+        axis, _ = lcd.scroll_axis()
+        if axis == 0:
+            length, cross, cam, other = lcd.width, lcd.height, cam_x, cam_y
         else:
-            h_add = self.zoom
-        if flip_y:
-            v_add = -self.zoom
-            y += (h8 - 1) * self.zoom
+            length, cross, cam, other = lcd.height, lcd.width, cam_y, cam_x
+        if lcd.scroll_top is None or lcd.scroll_size != length * lcd.scale:
+            lcd.scroll_area()
+            self.scroll_state = None
+        size = 8 * self.zoom
+        state = (tilemap, tilemap.version, self.buffer_version, other, self.zoom, self.pal_key, axis)
+        last = self.scroll_cam
+        if self.scroll_state != state or abs(cam - last) >= length:
+            start, end = cam, cam + length
+        elif cam > last:
+            start, end = last + length, cam + length
         else:
-            v_add = self.zoom
-        dy = y
-        for by in range(by0, by1):
-            dx = x
-            for bx in range(bx0, bx1):
-                c = self.buffer[by * self.buffer_w * 8 + bx]
-                c_pal = c in self.pal_dict
-                if c_pal or c != 0:
-                    if c_pal:
-                        c = self.pal_dict[c]
-                    fb.fill_rect(dx, dy, self.zoom, self.zoom, self.colors[c])
-                dx += h_add
-            dy += v_add
-            
+            start, end = cam, last
+        band = self.scroll_band
+        if band is None or len(band) < size * cross * 2:
+            band = self.scroll_band = bytearray(size * cross * 2)
+        band_mv = memoryview(band)
+        color = self.color(c)
+        p = start
+        while p < end:
+            # one tile column or row at most, without wrapping around the display memory
+            ring = p % length
+            n = min(end - p, length - ring, size - p % size)
+            if axis == 0:
+                fb = framebuf.FrameBuffer(band, n, cross, framebuf.RGB565)
+                fb.fill(color)
+                self.map_area(fb, tilemap, p, other, 0, 0, n, cross)
+                lcd.send_window(band_mv[:n * cross * 2], ring, 0, n, cross)
+            else:
+                fb = framebuf.FrameBuffer(band, cross, n, framebuf.RGB565)
+                fb.fill(color)
+                self.map_area(fb, tilemap, other, p, 0, 0, cross, n)
+                lcd.send_window(band_mv[:n * cross * 2], 0, ring, cross, n)
+            p += n
+        lcd.scroll(cam % length)
+        self.scroll_cam = cam
+        self.scroll_state = state
+        return end - start
+
+    def map_area(self, fb: framebuf.FrameBuffer, tilemap: TileMap, offset_x: int, offset_y: int, x0: int, y0: int, x1: int, y1: int):
+        """
+        Draw the tiles that cover the x0,y0 to x1,y1 area of the frame buffer, clipped by the area, x1 and y1 are excluded
+
+        Args:
+            fb (framebuf.FrameBuffer): The frame buffer to draw on
+            tilemap (TileMap): The tile map to draw
+            offset_x (int): The x position in the tile map drawn at x = 0, in pixels of the display
+            offset_y (int): The y position in the tile map drawn at y = 0, in pixels of the display
+            x0 (int): The left of the area
+            y0 (int): The top of the area
+            x1 (int): The right of the area
+            y1 (int): The bottom of the area
+        """
+        size = 8 * self.zoom
+        tx0 = max((x0 + offset_x) // size, 0)
+        tx1 = min((x1 + offset_x - 1) // size + 1, tilemap.w)
+        ty0 = max((y0 + offset_y) // size, 0)
+        ty1 = min((y1 + offset_y - 1) // size + 1, tilemap.h)
+        tiles = tilemap.tiles
+        clip = (x0, y0, x1, y1)
+        for ty in range(ty0, ty1):
+            i = ty * tilemap.w
+            for tx in range(tx0, tx1):
+                n = tiles[i + tx]
+                if n != EMPTY:
+                    self.spr_clip(fb, n, tx * size - offset_x, ty * size - offset_y, 1, 1, False, False, clip)
+
+    def print(self, fb: framebuf.FrameBuffer, text: str, x: int, y: int, c: int = 7, zoom: int = None):
+        """
+        Draw text with the 3 by 5 pixels font at x,y position, moved by the camera and clipped by the clip area.
+        Each character is 4 pixels wide and each line is 6 pixels tall, including the spacing
+
+        Args:
+            fb (framebuf.FrameBuffer): The frame buffer that stores actual display data
+            text (str): The text, "\\n" starts a new line
+            x (int): The x position on the actual display
+            y (int): The y position on the actual display
+            c (int): The color index [0,15], replaced by pal()
+            zoom (int): Scale of the pixels, the zoom of tiny_drawer by default
+        """
+        if zoom is None:
+            zoom = self.zoom
+        text = str(text)
+        lines = text.split("\n")
+        w = (max(len(line) for line in lines) * (GLYPH_W + 1) - 1) * zoom
+        h = (len(lines) * (GLYPH_H + 1) - 1) * zoom
+        if w <= 0:
+            return
+        x -= self.cam_x
+        y -= self.cam_y
+        clip = self.clip_rect
+        if x >= clip[2] or y >= clip[3] or x + w <= clip[0] or y + h <= clip[1]:
+            return
+        mark_dirty = getattr(fb, "mark_dirty", None)
+        if mark_dirty is not None:
+            mark_dirty(x, y, w, h)
+        color = self.colors[self.pal_dict.get(c, c)]
+        cache = self.text_cache
+        if cache is None or x < clip[0] or y < clip[1] or x + w > clip[2] or y + h > clip[3]:
+            self.draw_text(fb, lines, x, y, color, zoom, clip)
+            return
+        key = (text, color, zoom)
+        entry = cache.get(key)
+        if entry is None:
+            size = (w + 7) // 8 * h
+            if size > cache.max_bytes:
+                self.draw_text(fb, lines, x, y, color, zoom, clip)
+                return
+            image = framebuf.FrameBuffer(bytearray(size), w, h, framebuf.MONO_HLSB)
+            self.draw_text(image, lines, 0, 0, 1, zoom, (0, 0, w, h))
+            # the empty pixels become a color that is different from the text, and that color is skipped
+            palette = framebuf.FrameBuffer(bytearray(4), 2, 1, framebuf.RGB565)
+            palette.pixel(0, 0, color ^ 1)
+            palette.pixel(1, 0, color)
+            entry = (image, palette)
+            cache.put(key, entry, size)
+        fb.blit(entry[0], x, y, color ^ 1, entry[1])
+
+    def draw_text(self, fb: framebuf.FrameBuffer, lines: list, x: int, y: int, color: int, zoom: int, clip: tuple):
+        """
+        Draw lines of text with fill_rect, one rectangle for each run of pixels in a row of a glyph
+
+        Args:
+            fb (framebuf.FrameBuffer): The frame buffer to draw on
+            lines (list): The lines of text
+            x (int): The x position on the frame buffer
+            y (int): The y position on the frame buffer
+            color (int): The color of the frame buffer's format
+            zoom (int): Scale of the pixels
+            clip (tuple): The (x0, y0, x1, y1) clip area, x1 and y1 are excluded
+        """
+        cx0, cy0, cx1, cy1 = clip
+        for line in lines:
+            gx = x
+            for char in line:
+                bits = glyph(char)
+                row_y = y
+                shift = GLYPH_W * GLYPH_H
+                while bits and shift:
+                    shift -= GLYPH_W
+                    row = (bits >> shift) & 7
+                    i = 0
+                    while i < GLYPH_W:
+                        if row & (4 >> i):
+                            run = i
+                            while i < GLYPH_W and row & (4 >> i):
+                                i += 1
+                            x0 = max(gx + run * zoom, cx0)
+                            x1 = min(gx + i * zoom, cx1)
+                            y0 = max(row_y, cy0)
+                            y1 = min(row_y + zoom, cy1)
+                            if x0 < x1 and y0 < y1:
+                                fb.fill_rect(x0, y0, x1 - x0, y1 - y0, color)
+                        i += 1
+                    row_y += zoom
+                gx += (GLYPH_W + 1) * zoom
+            y += (GLYPH_H + 1) * zoom
+
     def pal(self, c0: int = None, c1: int = None):
         """
-        Change the colors when drawing, replace c0 with c1. Call pal() to reset
+        Change the colors when drawing, replace c0 with c1. Call pal() to reset.
+        Passing a dict as c0 replaces every color at once, like pal(table) in PICO-8
         
         Args:
-            c0 (int): The original color to replace
+            c0 (int): The original color to replace, or a dict of {c0: c1}
             c1 (int): The new color to use instead
         """
-        if isinstance(c0, int) and isinstance(c1, int):
+        if isinstance(c0, dict):
+            self.pal_dict = dict(c0)
+        elif isinstance(c0, int) and isinstance(c1, int):
             self.pal_dict[c0] = c1
         else:
             self.pal_dict = {}
+        # the palette state is part of the sprite cache key
+        self.pal_key = tuple(sorted(self.pal_dict.items()))
+        if self.index_cache is not None:
+            self.update_palette()
             
     def color(self, c: int) -> int:
         """
@@ -138,6 +1050,18 @@ class TinyDrawer:
             return self.colors[0]
         return self.colors[c]
     
+    def free_color(self) -> int:
+        """
+        Find an RGB565 color that is not used by the palette, used as the transparent color key
+
+        Returns:
+            int: The color integer in RGB565 format
+        """
+        c = 1
+        while c in self.colors:
+            c += 1
+        return c
+
     def c333_565(self, r: int, g: int, b: int) -> int:
         """
         Convert RGB333 (each color is 3 bits) to RGB565 with 0b_LLL_Bbb_LL_Rrr_LL_Ggg format
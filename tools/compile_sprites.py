@@ -0,0 +1,125 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+# Pre-render the sprites to RGB565 and write them as a Python module of bytes.
+# Run it on your computer, then upload the module or freeze it into the firmware,
+# so the sprites are read from flash:
+#
+#   python tools/compile_sprites.py sprites.txt sprites.py --zoom 4 --flips
+#   python tools/compile_sprites.py level1.bank level1.py --zoom 1 4 --sprites 0-11
+#
+# On the Pi Pico:
+#
+#   import sprites
+#   td = TinyDrawer(sprites)
+
+import argparse, os, sys
+
+# draw with the real TinyDrawer on the computer, so the sprites look the same
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "host"))
+import shims
+shims.install()
+
+import framebuf
+from tinydrawer import TinyDrawer
+
+def parse_sprites(text: str, count: int) -> list:
+    """
+    Parse a list of sprite indexes such as 0-4,8
+
+    Args:
+        text (str): Comma separated indexes and ranges, None for every sprite
+        count (int): The number of sprites in the sprite buffer
+
+    Returns:
+        list: True for every sprite to compile
+    """
+    if text is None:
+        return [True] * count
+    selected = [False] * count
+    for part in text.split(","):
+        first, _, last = part.partition("-")
+        for n in range(int(first), int(last or first) + 1):
+            if n < count:
+                selected[n] = True
+    return selected
+
+def is_empty(td: TinyDrawer, n: int) -> bool:
+    x0 = n % td.buffer_w * 8
+    y0 = n // td.buffer_w * 8
+    return not any(td.sget(x0 + i, y0 + j) for j in range(8) for i in range(8))
+
+def render(td: TinyDrawer, n: int, flips: int) -> bytes:
+    size = 8 * td.zoom
+    buffer = bytearray(size * size * 2)
+    sprite = framebuf.FrameBuffer(buffer, size, size, framebuf.RGB565)
+    sprite.fill(td.color_key)
+    td.draw(sprite, n, 0, 0, 1, 1, flips & 1 != 0, flips & 2 != 0)
+    return bytes(buffer)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render TinyDrawer sprites to a Python module of RGB565 bytes")
+    parser.add_argument("input", help="text file with the hex string, or a sprite bank file from tools/hex2bank.py")
+    parser.add_argument("output", help="path of the Python module")
+    parser.add_argument("--width", type=int, default=8, help="number of sprites horizontally in the hex string")
+    parser.add_argument("--height", type=int, default=4, help="number of sprites vertically in the hex string")
+    parser.add_argument("--zoom", type=int, nargs="+", default=[1], help="zoom levels to pre-render")
+    parser.add_argument("--flips", action="store_true", help="also pre-render the flipped sprites")
+    parser.add_argument("--sprites", help="only pre-render these sprites, for example 0-4,8")
+    args = parser.parse_args()
+
+    with open(args.input, "rb") as f:
+        is_bank = f.read(4) == b"TDSB"
+    td = TinyDrawer("0" * 64, 1, 1)
+    if is_bank:
+        ok = td.load_bank(args.input)
+    else:
+        with open(args.input) as f:
+            ok = td.set_buffer_hex(f.read(), args.width, args.height)
+    if not ok:
+        sys.exit("can't read the sprites of {}".format(args.input))
+    td.pack()
+    count = td.buffer_w * td.buffer_h
+    selected = parse_sprites(args.sprites, count)
+    variants = 4 if args.flips else 1
+
+    lines = [
+        "# Sprites of {} pre-rendered by tools/compile_sprites.py, don't edit".format(os.path.basename(args.input)),
+        "from micropython import const",
+        "",
+        "BUFFER_W = const({})".format(td.buffer_w),
+        "BUFFER_H = const({})".format(td.buffer_h),
+        "COUNT = const({})".format(count),
+        "KEY = const({})".format(td.color_key),
+        "FLIPS = const({})".format(variants),
+        "ZOOMS = ({},)".format(", ".join(str(zoom) for zoom in args.zoom)),
+        "",
+        "# the packed sprite buffer, for the zoom levels and palettes that aren't pre-rendered",
+        "SHEET = {!r}".format(bytes(td.buffer)),
+        "",
+        "# index = (zoom index * FLIPS + flip_x + 2 * flip_y) * COUNT + sprite index,",
+        "# None when the sprite isn't pre-rendered, empty when it is fully transparent",
+        "SPRITES = (",
+    ]
+    size = 0
+    for zoom in args.zoom:
+        td.zoom = zoom
+        for flips in range(variants):
+            for n in range(count):
+                if not selected[n]:
+                    data = None
+                elif is_empty(td, n):
+                    data = b""
+                else:
+                    data = render(td, n, flips)
+                    size += len(data)
+                lines.append("    {!r}, # {} zoom {} flips {}".format(data, n, zoom, flips))
+    lines.append(")")
+    with open(args.output, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    print("wrote {} bytes of sprites to {}".format(size, args.output))
+
+if __name__ == "__main__":
+    main()
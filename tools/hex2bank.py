@@ -0,0 +1,36 @@
+# ----------------------------------------------------------------------------
+# TinyDrawer for Raspberry Pi Pico is licensed under the MLT License.
+# Created by Saranomy 2024.
+# ----------------------------------------------------------------------------
+
+# Convert the hex string of the Sprite Buffer Editor to a sprite bank file.
+# Run it on your computer, then upload the bank file to the Pi Pico:
+#
+#   python tools/hex2bank.py sprites.txt level1.bank --width 8 --height 4
+
+import argparse, os, sys
+
+# import the bank module alone, the tinydrawer package needs framebuf from MicroPython
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "tinydrawer"))
+from bank import write_bank
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a TinyDrawer hex string to a sprite bank file")
+    parser.add_argument("input", help="text file with the hex string, - to read from stdin")
+    parser.add_argument("output", help="path of the sprite bank file")
+    parser.add_argument("--width", type=int, default=8, help="number of sprites horizontally")
+    parser.add_argument("--height", type=int, default=4, help="number of sprites vertically")
+    args = parser.parse_args()
+
+    if args.input == "-":
+        hex_string = sys.stdin.read()
+    else:
+        with open(args.input) as f:
+            hex_string = f.read()
+    size = write_bank(args.output, hex_string, args.width, args.height)
+    if size == 0:
+        sys.exit("the hex string must have {} digits for {} x {} sprites".format(64 * args.width * args.height, args.width, args.height))
+    print("wrote {} bytes to {}".format(size, args.output))
+
+if __name__ == "__main__":
+    main()